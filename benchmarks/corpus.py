@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""The deterministic generator of synthetic C++ source trees.
+
+The same parameters always generate the same tree, so benchmark results of
+different commits are comparable. Run it from the repository root:
+
+    python -m benchmarks.corpus DIR [--files=N] [--lines=N] [--depth=N]
+                                    [--error-density=RATIO]
+                                    [--excluded-dirs=N] [--seed=N]
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import random
+
+
+# The name of the directories generated to be excluded. The harness excludes
+# them with the `excludedir` pattern `**/EXCLUDED_DIR_PREFIX*`.
+EXCLUDED_DIR_PREFIX = 'build_'
+# The lines with a lint error that are inserted according to the error
+# density. Each line triggers at least one cpplint error.
+_ERROR_LINES = ('  int value=0;',
+                '  int trailing = 0;   ',
+                '\tint tab = 0;',
+                '  int long_line = 0;  // ' + 'x' * 80,
+                '  if(value) {}',
+                '  char* buffer = (char*)malloc(16);')
+# The lines without lint errors.
+_CLEAN_LINES = ('  int value = 0;',
+                '  value += 1;',
+                '  if (value > 0) {',
+                '    value -= 1;',
+                '  }',
+                '  // Updates the value.')
+
+
+class CorpusSpec(object):
+    """The parameters of a generated corpus."""
+
+    def __init__(self, files=1000, lines=200, depth=4, error_density=0.05,
+                 excluded_dirs=2, seed=0):
+        """Initialization.
+
+        Args:
+            files: the number of linted source files, split between headers
+                and implementation files.
+            lines: the average number of lines of each file.
+            depth: the maximum nesting depth of directories.
+            error_density: the ratio of lines containing a lint error.
+            excluded_dirs: the number of directories to be excluded, each
+                containing as many files as an average directory.
+            seed: the seed of the random number generator.
+        """
+        self.files = files
+        self.lines = lines
+        self.depth = depth
+        self.error_density = error_density
+        self.excluded_dirs = excluded_dirs
+        self.seed = seed
+
+    def to_dict(self):
+        """Returns the parameters as a dict."""
+        return dict(self.__dict__)
+
+def _generate_file(rng, path, spec, is_header):
+    """Generates the content of a source file."""
+    line_count = max(1, int(rng.gauss(spec.lines, spec.lines / 4.0)))
+    guard = path.upper().replace(os.sep, '_').replace('.', '_') + '_'
+    lines = ['// Copyright 2015 cclint benchmarks']
+    if is_header:
+        lines += ['#ifndef ' + guard, '#define ' + guard]
+    lines += ['', 'namespace corpus {', '', 'int Function() {']
+    for _ in range(line_count):
+        if rng.random() < spec.error_density:
+            lines.append(rng.choice(_ERROR_LINES))
+        else:
+            lines.append(rng.choice(_CLEAN_LINES))
+    lines += ['  return 0;', '}', '', '}  // namespace corpus']
+    if is_header:
+        lines.append('#endif  // ' + guard)
+    return '\n'.join(lines) + '\n'
+
+def generate(root, spec):
+    """Generates a corpus.
+
+    Args:
+        root: the directory to generate the corpus in. It is created if it
+            does not exist.
+        spec: a `CorpusSpec` instance.
+
+    Returns:
+        A list of the generated paths of linted files relative to `root`.
+    """
+    rng = random.Random(spec.seed)
+    dirnames = ['src']
+    # Creates a tree of directories with up to `depth` levels.
+    dir_count = max(1, spec.files // 20)
+    while len(dirnames) < dir_count:
+        parent = rng.choice(dirnames)
+        if parent.count('/') + 1 >= spec.depth:
+            continue
+        dirnames.append('{0}/module_{1:d}'.format(parent, len(dirnames)))
+
+    paths = list()
+    for index in range(spec.files):
+        extension = '.h' if index % 2 == 0 else '.cc'
+        paths.append('{0}/file_{1:d}{2}'.format(dirnames[index % dir_count],
+                                                index // 2, extension))
+    excluded_paths = list()
+    files_per_dir = max(1, spec.files // dir_count)
+    for index in range(spec.excluded_dirs):
+        dirname = '{0}/{1}{2:d}'.format(rng.choice(dirnames),
+                                        EXCLUDED_DIR_PREFIX, index)
+        excluded_paths.extend('{0}/generated_{1:d}.cc'.format(dirname, i)
+                              for i in range(files_per_dir))
+
+    for path in paths + excluded_paths:
+        full_path = os.path.join(root, *path.split('/'))
+        if not os.path.isdir(os.path.dirname(full_path)):
+            os.makedirs(os.path.dirname(full_path))
+        content = _generate_file(rng, path.replace('/', os.sep), spec,
+                                 path.endswith('.h'))
+        with open(full_path, 'w', encoding='utf8') as source_file:
+            source_file.write(content)
+    return [path.replace('/', os.sep) for path in paths]
+
+def add_arguments(parser):
+    """Adds the arguments of `CorpusSpec` to an argument parser."""
+    default_spec = CorpusSpec()
+    parser.add_argument('--files', type=int, default=default_spec.files,
+                        help='the number of linted source files')
+    parser.add_argument('--lines', type=int, default=default_spec.lines,
+                        help='the average number of lines of each file')
+    parser.add_argument('--depth', type=int, default=default_spec.depth,
+                        help='the maximum nesting depth of directories')
+    parser.add_argument('--error-density', type=float,
+                        default=default_spec.error_density,
+                        help='the ratio of lines containing a lint error')
+    parser.add_argument('--excluded-dirs', type=int,
+                        default=default_spec.excluded_dirs,
+                        help='the number of directories to be excluded')
+    parser.add_argument('--seed', type=int, default=default_spec.seed,
+                        help='the seed of the random number generator')
+
+def get_spec(args):
+    """Creates a `CorpusSpec` instance from parsed arguments."""
+    return CorpusSpec(args.files, args.lines, args.depth, args.error_density,
+                      args.excluded_dirs, args.seed)
+
+def main():
+    """Generates a corpus."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('root', help='the directory to generate the corpus')
+    add_arguments(parser)
+    args = parser.parse_args()
+    paths = generate(args.root, get_spec(args))
+    print('Generated {0:d} files in {1}'.format(len(paths), args.root))
+
+if __name__ == '__main__':
+    main()
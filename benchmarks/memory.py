@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""The check that the memory of a cclint run does not grow with the tree.
+
+It generates empty object files up to the specified number of entries in a
+temporary directory, along with two corpora generated by `benchmarks.corpus`:
+a small one with a tenth of the linted files and a large one with all of
+them. For each number of jobs, cclint runs in a subprocess on the object
+files with each corpus. The check fails if the peak RSS of any process of a
+run exceeds the ceiling, or if the peak RSS of the large run exceeds that of
+the small run by more than the allowed growth, so the memory must stay flat
+as the number of linted files grows. The time until the first result is
+printed as well, which shows whether linting starts before the walk
+finishes. Run it from the repository root:
+
+    python -m benchmarks.memory [--entries=N] [--max-rss=MB]
+                                [--max-growth=MB] [--jobs=N]
+                                [corpus arguments]
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import corpus
+
+
+# The number of entries in each generated directory of object files.
+_ENTRIES_PER_DIR = 1000
+# The ratio of the linted files of the small corpus to the large one.
+_SMALL_CORPUS_RATIO = 10
+# The command running cclint in a subprocess.
+_CCLINT_COMMAND = (sys.executable, '-c',
+                   'from cclint import main; main.main()')
+
+
+def generate_entries(root, count):
+    """Generates empty object files, which are walked but not linted.
+
+    Args:
+        root: the directory to generate the files in.
+        count: the number of files to generate.
+    """
+    for index in range(count):
+        if index % _ENTRIES_PER_DIR == 0:
+            dirname = os.path.join(
+                root, 'objects', 'dir_{0:d}'.format(index // _ENTRIES_PER_DIR))
+            os.makedirs(dirname)
+        open(os.path.join(dirname, 'file_{0:d}.o'.format(index)), 'w',
+             encoding='utf8').close()
+
+def measure(root, jobs, paths):
+    """Runs cclint on a tree.
+
+    Args:
+        root: the directory to run cclint in.
+        jobs: the number of worker processes.
+        paths: the list of the directories to lint, relative to `root`.
+
+    Returns:
+        A tuple of the exit code, the peak RSS of the largest process in
+        megabytes, the seconds until the first result, the number of linted
+        files and the total elapsed seconds.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))] +
+        [path for path in [env.get('PYTHONPATH')] if path])
+    start_time = time.time()
+    process = subprocess.Popen(
+        _CCLINT_COMMAND + ('--expanddir=recursive', '--output-format=jsonl',
+                           '--jobs={0:d}'.format(jobs),
+                           '--excludedir=**/' + corpus.EXCLUDED_DIR_PREFIX +
+                           '*') + tuple(paths),
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=root, env=env)
+    first_result_time = None
+    file_counts = 0
+    for line in process.stdout:
+        if first_result_time is None:
+            first_result_time = time.time() - start_time
+        if line.startswith(b'{"type": "file"'):
+            file_counts += 1
+    process.stdout.close()
+    # The usage of the process includes its reaped worker processes.
+    status, usage = os.wait4(process.pid, 0)[1:]
+    process.returncode = os.WEXITSTATUS(status)
+    # `ru_maxrss` is in kilobytes on Linux and in bytes on macOS.
+    peak_rss = usage.ru_maxrss / (1024.0 * 1024 if sys.platform == 'darwin'
+                                  else 1024.0)
+    return (process.returncode, peak_rss, first_result_time, file_counts,
+            time.time() - start_time)
+
+def main():
+    """Runs the check and exits with 1 if the peak RSS exceeds the ceiling."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, default=1000000,
+                        help='the number of files in the generated tree')
+    parser.add_argument('--max-rss', type=float, default=64,
+                        help='the ceiling of the peak RSS in megabytes')
+    parser.add_argument('--max-growth', type=float, default=2,
+                        help='the allowed growth of the peak RSS in megabytes '
+                             'from the small corpus to the large one')
+    parser.add_argument('--jobs', type=int, action='append',
+                        help='the number of jobs to run cclint with, which '
+                             'can be specified multiple times')
+    corpus.add_arguments(parser)
+    parser.set_defaults(files=20000, lines=50)
+    args = parser.parse_args()
+
+    passed = True
+    root = tempfile.mkdtemp(prefix='cclint-memory-')
+    try:
+        large_spec = corpus.get_spec(args)
+        small_spec = corpus.get_spec(args)
+        small_spec.files = max(1, large_spec.files // _SMALL_CORPUS_RATIO)
+        generated_counts = 0
+        for name, spec in (('small', small_spec), ('large', large_spec)):
+            generated_counts += len(corpus.generate(os.path.join(root, name),
+                                                    spec))
+        generate_entries(root, max(0, args.entries - generated_counts))
+
+        for jobs in args.jobs or (1, 2):
+            peak_rss_by_name = dict()
+            for name in ('small', 'large'):
+                exit_code, peak_rss, first_result_time, file_counts, \
+                    elapsed_time = measure(root, jobs, ['objects', name])
+                peak_rss_by_name[name] = peak_rss
+                failed = exit_code not in (0, 1) or peak_rss > args.max_rss
+                passed = passed and not failed
+                print('{0:<6} jobs={1:<3d} {2:<5} peak RSS {3:6.1f} MB '
+                      '(ceiling {4:g} MB), first result after {5:.2f}s, '
+                      '{6:d} files in {7:.1f}s'.format(
+                          'FAIL' if failed else 'OK', jobs, name, peak_rss,
+                          args.max_rss, first_result_time or 0, file_counts,
+                          elapsed_time))
+            growth = peak_rss_by_name['large'] - peak_rss_by_name['small']
+            failed = growth > args.max_growth
+            passed = passed and not failed
+            print('{0:<6} jobs={1:<3d} peak RSS growth {2:+.1f} MB (allowed '
+                  '{3:g} MB)'.format('FAIL' if failed else 'OK', jobs,
+                                     growth, args.max_growth))
+    finally:
+        shutil.rmtree(root)
+    sys.exit(not passed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""The check that pruning cpplint checks does not change the lint results.
+
+It generates a corpus with `benchmarks.corpus` in a temporary directory,
+along with a source file triggering a wide range of cpplint's categories,
+and lints every file with and without a `pruning.CheckPruner` for each set
+of filters. The check fails if the errors of any file differ, and the time
+of both paths is printed. Existing files and directories can be linted as
+well. Run it from the repository root:
+
+    python -m benchmarks.pruning [--repeat=N] [corpus arguments] [path...]
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cpplint
+
+from benchmarks import corpus
+from cclint import linter
+from cclint import pruning
+from cclint import utility
+
+
+# The sets of filters to check, including filters selecting files and lines.
+_FILTER_SETS = ('',
+                '-whitespace',
+                '-whitespace,+whitespace/tab',
+                '-readability,-runtime,-build/include_what_you_use',
+                '-whitespace,-readability,-runtime,-build,-legal',
+                '-,+whitespace/line_length',
+                '-whitespace,+whitespace/parens::12',
+                '-build,-legal,-runtime/int,-whitespace/comments')
+# The source file triggering a wide range of cpplint's categories.
+_SAMPLE_SOURCE = r'''// Copyright 2015 cclint benchmarks
+#include <stdio.h>
+#include <string>
+#include <vector>
+#include <cfenv>
+#include "sample.h"
+
+using namespace std;
+
+namespace {
+  int indented = 0;
+}
+
+static string global_name = "name";
+long long counter = 0;
+
+class Base {
+ public:
+  Base(int value) : value_(value) {}
+  virtual void Run() override;
+  virtual ~Base() {}
+  void Set(int& value);
+ private:
+  const string& name_;
+  int value_;
+};
+
+void Function(int *pointer)  {
+  char buffer[10];
+  sprintf(buffer, "%d", *pointer);
+  printf(buffer);
+  int* cast = (int*)pointer;
+  if(*pointer==1){ *pointer++; }
+  else {
+  }
+  for (int i = 0; i < 10; ++i) ;
+  while (true) {}
+  strtok(buffer, ",");
+  CHECK(*pointer == 1);
+  VLOG(ERROR) << "error";
+  auto pair = make_pair<int, int>(1, 2);
+  std::vector<int> values;
+  if (values.size() > 0 and true) return;
+  memset(buffer, sizeof(buffer), 0);
+  // TODO: fix this
+  /* multi-line
+     comment */
+}
+'''
+
+
+def _lint(filenames, filters, pruner, repeat):
+    """Lints the files with the filters.
+
+    Returns:
+        A tuple of the minimum elapsed seconds and a dict mapping each
+        filename to its errors and warning.
+    """
+    best_time = None
+    results = None
+    state = linter.get_cpplint_state()
+    try:
+        cpplint._SetFilters(filters)  # pylint: disable=protected-access
+        for _ in range(repeat):
+            start_time = time.time()
+            results = dict(
+                (filename, linter.lint_file(filename, 1, pruner=pruner))
+                for filename in filenames)
+            elapsed_time = time.time() - start_time
+            if best_time is None or elapsed_time < best_time:
+                best_time = elapsed_time
+    finally:
+        linter.set_cpplint_state(state)
+    return best_time, results
+
+def _describe(errors):
+    """Returns the comparable records of errors."""
+    return [(error.line, error.category, error.confidence, error.message)
+            for error in errors]
+
+def check(filenames, repeat):
+    """Lints the files with and without pruning for each set of filters.
+
+    Args:
+        filenames: the filenames to lint.
+        repeat: the number of times to lint the files.
+
+    Returns:
+        True if the results are the same for all sets of filters.
+    """
+    passed = True
+    pruner = pruning.CheckPruner()
+    for filters in _FILTER_SETS:
+        full_time, full_results = _lint(filenames, filters, None, repeat)
+        pruned_time, pruned_results = _lint(filenames, filters, pruner,
+                                            repeat)
+        different_files = [
+            filename for filename in filenames
+            if _describe(full_results[filename][0]) !=
+            _describe(pruned_results[filename][0]) or
+            full_results[filename][1] != pruned_results[filename][1]]
+        passed = passed and not different_files
+        error_counts = sum(len(errors) for errors, _ in full_results.values())
+        print('{0:<6} {1:<52} {2:7d} errors {3:7.3f}s -> {4:7.3f}s '
+              '({5:+.1f}%)'.format(
+                  'FAIL' if different_files else 'OK', repr(filters),
+                  error_counts, full_time, pruned_time,
+                  (pruned_time / full_time - 1) * 100))
+        for filename in different_files:
+            print('       the errors of {0} differ'.format(filename))
+    return passed
+
+def main():
+    """Runs the check and exits with 1 if the results differ."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='the number of times to lint the files')
+    parser.add_argument('paths', nargs='*',
+                        help='the existing files and directories to lint')
+    corpus.add_arguments(parser)
+    args = parser.parse_args()
+
+    filenames = list()
+    for path in args.paths:
+        if os.path.isdir(path):
+            filenames.extend(utility.expand_directory(path, True))
+        else:
+            filenames.append(path)
+    root = tempfile.mkdtemp(prefix='cclint-pruning-')
+    try:
+        filenames.extend(os.path.join(root, path)
+                         for path in corpus.generate(root,
+                                                     corpus.get_spec(args)))
+        sample_path = os.path.join(root, 'sample.cc')
+        with open(sample_path, 'w', encoding='utf8') as sample_file:
+            sample_file.write(_SAMPLE_SOURCE)
+        filenames.append(sample_path)
+        passed = check(filenames, args.repeat)
+    finally:
+        shutil.rmtree(root)
+    sys.exit(not passed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""The micro-benchmark of rendering lint results with `FileStream`.
+
+It renders a synthetic run with the current `FileStream` from structured
+errors, and with the previous implementation, which parsed cpplint's text
+output, printed each line unbuffered and looked up each ANSI code on every
+use. The output is written to the null device. Run it from the repository root:
+
+    python -m benchmarks.render [--files=N] [--errors=N]
+"""
+
+from __future__ import print_function
+import argparse
+import codecs
+import os
+import sys
+import time
+
+from cclint import file_stream
+from cclint import linter
+from cclint import utility
+
+
+class LegacyFileStream(file_stream.FileStream):
+    """The rendering path of `FileStream` before output was buffered."""
+
+    def report(self, filename, errors, warning):
+        """Formats the text output the way `begin()`, `write()` and `end()`
+        did. The `errors` argument is a list of cpplint's output strings."""
+        self.filename = filename
+        self.error_counts = 0
+        self.original_stderr = sys.stderr
+        sys.stderr = self
+        for output in errors:
+            sys.stderr = self.original_stderr
+            self._write_legacy(output)
+            sys.stderr = self
+        sys.stderr = self.original_stderr
+        self.filename = ''
+
+    def _print_filename(self, line_indent, state_symbol,
+                        state_ansi_color_code):
+        """Prints the formatted filename with a `print()` call per line."""
+        current_file_has_error = (state_symbol == self.error)
+        if self.processed_files == 0 or \
+           (self.previous_file_has_error and not current_file_has_error):
+            print('')
+        print(utility.get_ansi_code('FOREGROUND_RESET') + ' ' * line_indent +
+              state_ansi_color_code + state_symbol + ' ' +
+              utility.get_ansi_code('FOREGROUND_RESET') +
+              utility.get_ansi_code('STYLE_NORMAL') + self.filename)
+        self.processed_files += 1
+        self.previous_file_has_error = current_file_has_error
+
+    def _write_legacy(self, output):
+        """Formats an error message with a `print()` call per line."""
+        line_indent = 6
+        if output.startswith('Done'):
+            return
+        self.error_counts += 1
+        self.total_error_counts += 1
+        if self.error_counts == 1:
+            if self.processed_files > 0:
+                print('')
+            self._print_filename(line_indent, self.error,
+                                 utility.get_ansi_code('FOREGROUND_RED'))
+        line_number, description = output.split(':', 2)[1:]
+        print(' ' * (line_indent + 2) +
+              utility.get_ansi_code('FOREGROUND_YELLOW') + '#' + line_number +
+              utility.get_ansi_code('FOREGROUND_WHITE') + ': ' +
+              utility.get_ansi_code('STYLE_DIM') + description.strip() +
+              utility.get_ansi_code('STYLE_RESET_ALL'))
+
+def generate_results(file_count, error_count):
+    """Generates the results of a synthetic run.
+
+    Args:
+        file_count: the number of files.
+        error_count: the total number of errors spread over the files.
+
+    Returns:
+        A tuple of two lists of tuples of a filename and its errors. The
+        errors are `linter.LintError` instances in the first list and
+        cpplint's output strings in the second list.
+    """
+    results = list()
+    legacy_results = list()
+    errors_per_file = max(1, error_count // file_count)
+    message = 'Line ends in whitespace.  Consider deleting these extra spaces.'
+    for file_index in range(file_count):
+        filename = 'src/module_{0:d}/file_{0:d}.cc'.format(file_index)
+        errors = [linter.LintError(filename, line, 'whitespace/end_of_line', 4,
+                                   message)
+                  for line in range(1, errors_per_file + 1)]
+        outputs = ['{0}:{1:d}:  {2}  [{3}] [{4:d}]\n'.format(
+            filename, error.line, error.message, error.category,
+            error.confidence) for error in errors]
+        outputs.append('Done processing {0}\n'.format(filename))
+        results.append((filename, errors))
+        legacy_results.append((filename, outputs))
+    return results, legacy_results
+
+def measure(stream_class, results):
+    """Renders the results and returns the elapsed seconds."""
+    original_stdout = sys.stdout
+    with open(os.devnull, 'w', encoding='utf8') as null_file:
+        sys.stdout = null_file
+        try:
+            stream = stream_class(sys.stderr,
+                                  codecs.getreader('utf8'),
+                                  codecs.getwriter('utf8'),
+                                  'replace')
+            start_time = time.time()
+            for filename, errors in results:
+                stream.report(filename, errors, None)
+            stream.finish()
+            elapsed_time = time.time() - start_time
+        finally:
+            sys.stdout = original_stdout
+    return elapsed_time
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--files', type=int, default=1000,
+                        help='the number of files')
+    parser.add_argument('--errors', type=int, default=100000,
+                        help='the total number of errors')
+    args = parser.parse_args()
+
+    results, legacy_results = generate_results(args.files, args.errors)
+    legacy_time = measure(LegacyFileStream, legacy_results)
+    current_time = measure(file_stream.FileStream, results)
+    print('Rendered {0:d} errors in {1:d} files'.format(
+        args.files * max(1, args.errors // args.files), args.files))
+    print('  legacy:  {0:.3f} seconds'.format(legacy_time))
+    print('  current: {0:.3f} seconds ({1:.1f}x)'.format(
+        current_time, legacy_time / current_time))
+
+if __name__ == '__main__':
+    main()
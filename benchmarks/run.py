@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""The benchmark harness timing each stage of a cclint run.
+
+It generates a corpus with `benchmarks.corpus` in a temporary directory and
+times the discovery with `utility.expand_directory()`, the linting with
+`linter.lint_file()` and the rendering with `file_stream.FileStream`
+separately. Each stage is repeated and the fastest time is reported. The
+results are printed as JSON, and can be compared with the results of another
+commit. Run it from the repository root:
+
+    python -m benchmarks.run [--output=FILE] [--compare=FILE] [--repeat=N]
+                             [corpus arguments]
+"""
+
+from __future__ import print_function
+import argparse
+import codecs
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import cpplint
+
+from benchmarks import corpus
+from cclint import exclusion
+from cclint import file_stream
+from cclint import linter
+from cclint import utility
+
+
+def _get_commit():
+    """Returns the current git commit of the repository, or `None`."""
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.STDOUT,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('utf8').strip()
+
+def _measure(function, repeat):
+    """Calls a function repeatedly.
+
+    Returns:
+        A tuple of the minimum elapsed seconds and the last returned value.
+    """
+    best_time = None
+    result = None
+    for _ in range(repeat):
+        start_time = time.time()
+        result = function()
+        elapsed_time = time.time() - start_time
+        if best_time is None or elapsed_time < best_time:
+            best_time = elapsed_time
+    return best_time, result
+
+def discover():
+    """Walks the corpus in the current directory like `--expanddir`."""
+    exclusion_index = exclusion.ExclusionIndex()
+    exclusion_index.add_dir_glob('**/' + corpus.EXCLUDED_DIR_PREFIX + '*')
+    return list(utility.expand_directory('src', True, exclusion_index))
+
+def lint(filenames):
+    """Lints the files in the current process."""
+    return [(filename,) + linter.lint_file(filename, 1)
+            for filename in filenames]
+
+def render(results):
+    """Renders the results with `FileStream` to the null device."""
+    original_stdout = sys.stdout
+    with open(os.devnull, 'w', encoding='utf8') as null_file:
+        sys.stdout = null_file
+        try:
+            stream = file_stream.FileStream(sys.stderr,
+                                            codecs.getreader('utf8'),
+                                            codecs.getwriter('utf8'),
+                                            'replace')
+            for filename, errors, warning in results:
+                stream.report(filename, errors, warning)
+            stream.finish()
+        finally:
+            sys.stdout = original_stdout
+    return stream.total_error_counts
+
+def run(spec, repeat):
+    """Runs the benchmark.
+
+    Args:
+        spec: a `corpus.CorpusSpec` instance.
+        repeat: the number of times to repeat each stage.
+
+    Returns:
+        A dict of the results.
+    """
+    root = tempfile.mkdtemp(prefix='cclint-benchmark-')
+    original_cwd = os.getcwd()
+    try:
+        corpus.generate(root, spec)
+        os.chdir(root)
+        discovery_time, filenames = _measure(discover, repeat)
+        lint_time, results = _measure(lambda: lint(filenames), repeat)
+        render_time, error_counts = _measure(lambda: render(results), repeat)
+        byte_counts = sum(os.path.getsize(f) for f in filenames)
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(root)
+
+    return {
+        'commit': _get_commit(),
+        'python': platform.python_version(),
+        'cpplint': cpplint.__VERSION__,
+        'corpus': spec.to_dict(),
+        'repeat': repeat,
+        'stages': {
+            'discovery': {'seconds': discovery_time,
+                          'files': len(filenames)},
+            'lint': {'seconds': lint_time,
+                     'bytes': byte_counts,
+                     'files_per_second': len(filenames) / lint_time},
+            'render': {'seconds': render_time,
+                       'errors': error_counts},
+        },
+    }
+
+def compare(baseline, results):
+    """Prints the change of each stage compared with a baseline."""
+    for stage in sorted(results['stages']):
+        seconds = results['stages'][stage]['seconds']
+        baseline_seconds = baseline['stages'].get(stage, {}).get('seconds')
+        if not baseline_seconds:
+            continue
+        print('{0:<10} {1:8.3f}s -> {2:8.3f}s ({3:+.1f}%)'.format(
+            stage, baseline_seconds, seconds,
+            (seconds / baseline_seconds - 1) * 100), file=sys.stderr)
+
+def main():
+    """Runs the benchmark and prints the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--output', help='the file to write the results')
+    parser.add_argument('--compare',
+                        help='the results of a previous run to compare with')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='the number of times to repeat each stage')
+    corpus.add_arguments(parser)
+    args = parser.parse_args()
+
+    results = run(corpus.get_spec(args), args.repeat)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf8') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, encoding='utf8') as baseline_file:
+            compare(json.load(baseline_file), results)
+
+if __name__ == '__main__':
+    main()
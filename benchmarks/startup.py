@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""The import time budget check of cclint's entry points.
+
+cclint is run many times from hooks, so its startup matters. This check
+imports each entry point in a fresh interpreter with `python -X importtime`,
+and fails if the fastest import exceeds its budget or imports a module that
+the mode does not need. Run it from the repository root:
+
+    python -m benchmarks.startup [--repeat=N]
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+
+# The entry points to check. Each is a tuple of the imported module, the
+# description of the mode, the budget in milliseconds and the modules that
+# must not be imported.
+_ENTRY_POINTS = (
+    ('cclint', 'package', 10,
+     ('colorama', 'cpplint', 'multiprocessing')),
+    ('cclint.main', 'client', 40,
+     ('cclint.linter', 'cclint.server', 'colorama', 'cpplint',
+      'multiprocessing', 'traceback')),
+    ('cclint.command', 'lint', 100,
+     ('colorama', 'concurrent.futures', 'multiprocessing', 'socket',
+      'tempfile', 'urllib.request', 'xml.sax')),
+)
+# The pattern of a line printed by `-X importtime`, which contains the
+# cumulative time in microseconds, the indentation and the module name.
+_IMPORT_TIME_PATTERN = re.compile(
+    r'^import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def measure(module):
+    """Imports a module in a fresh interpreter.
+
+    Returns:
+        A tuple of the import time of the module and its parent packages in
+        milliseconds, and the set of all imported module names.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + [path for path in [env.get('PYTHONPATH')] if path])
+    output = subprocess.check_output(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stderr=subprocess.STDOUT, env=env).decode('utf8')
+
+    names = module.split('.')
+    targets = set('.'.join(names[:index + 1]) for index in range(len(names)))
+    elapsed_time = 0
+    imported_modules = set()
+    for line in output.splitlines():
+        match = _IMPORT_TIME_PATTERN.match(line)
+        if match is None:
+            continue
+        imported_modules.add(match.group(3))
+        if not match.group(2) and match.group(3) in targets:
+            elapsed_time += int(match.group(1))
+    return elapsed_time / 1000.0, imported_modules
+
+def main():
+    """Checks the entry points and exits with 1 if any check fails."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='the number of times to import each module')
+    args = parser.parse_args()
+
+    failed = False
+    for module, mode, budget, disallowed_modules in _ENTRY_POINTS:
+        results = [measure(module) for _ in range(args.repeat)]
+        elapsed_time = min(result[0] for result in results)
+        imported_disallowed_modules = sorted(
+            set(disallowed_modules) & results[0][1])
+        passed = elapsed_time <= budget and not imported_disallowed_modules
+        failed = failed or not passed
+        print('{0:<6} {1:<16} {2:8.1f} ms (budget {3:d} ms)'.format(
+            'OK' if passed else 'FAIL', module, elapsed_time, budget))
+        if imported_disallowed_modules:
+            print('       the {0} mode imports {1}'.format(
+                mode, ', '.join(imported_disallowed_modules)))
+    sys.exit(failed)
+
+if __name__ == '__main__':
+    main()
@@ -28,11 +28,30 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
-"""The cclint package."""
+"""The cclint package.
 
-from cclint import command
-from cclint import file_stream
-from cclint import utility
+The submodules are imported on first access instead of with the package, and
+`lint_sources()` imports the linter on first call, so importing a single
+submodule does not import cpplint and all the others.
+"""
 
+import importlib
 
-__all__ = ['command', 'file_stream', 'utility']
+
+__all__ = ['command', 'file_stream', 'lint_sources', 'utility']
+
+
+def lint_sources(sources, options=None):
+    """Runs cpplint on the contents of files without reading them.
+
+    This function calls `cclint.linter.lint_sources()`, which is documented
+    there, and imports it on first use.
+    """
+    from cclint import linter
+    return linter.lint_sources(sources, options)
+
+def __getattr__(name):
+    """Imports the submodules listed in `__all__` lazily."""
+    if name in __all__:
+        return importlib.import_module('cclint.' + name)
+    raise AttributeError("module 'cclint' has no attribute '{0}'".format(name))
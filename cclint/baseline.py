@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""This module contains the baseline of the known findings.
+
+Each finding is fingerprinted by its path relative to the directory of the
+baseline file, its category and the text of its line with normalized
+whitespace, so a finding is still known after lines are inserted or removed
+above it, and when cclint runs from another directory. The fingerprints are
+64-bit hashes, stored in a file as a sorted array after a header with one
+item per finding, and looked up in the loaded array by binary search. Each
+known finding hides only as many findings with the same fingerprint as it
+was recorded.
+"""
+
+import array
+import bisect
+import hashlib
+import os
+import sys
+
+
+# The header of a baseline file, which contains the format version.
+_BASELINE_HEADER = b'CCLINT-BASELINE-1\n'
+# The type code of `array.array` for unsigned 64-bit integers.
+_FINGERPRINT_TYPECODE = 'Q'
+
+
+def get_path(filename, root):
+    """Returns the path of a file in the fingerprints of its findings.
+
+    Args:
+        filename: the linted filename.
+        root: the directory the path is relative to, which is the directory
+            of the baseline file.
+
+    Returns:
+        The path relative to `root` with '/' as the separator, or '-' for
+        stdin.
+    """
+    if filename == '-':
+        return filename
+    try:
+        path = os.path.relpath(filename, root)
+    except ValueError:
+        # The file is on another drive on Windows.
+        path = os.path.abspath(filename)
+    return path.replace(os.sep, '/')
+
+def get_fingerprint(path, category, line_text):
+    """Computes the fingerprint of a finding.
+
+    Args:
+        path: the path of the file of the finding returned by `get_path()`.
+        category: the category string of the finding.
+        line_text: the text of the line of the finding, or the empty string
+            for findings of the whole file.
+
+    Returns:
+        A 64-bit integer.
+    """
+    key = '\0'.join((path, category, ' '.join(line_text.split())))
+    digest = hashlib.blake2b(key.encode('utf8', 'surrogateescape'),
+                             digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def get_fingerprints(filename, errors, content, root):
+    """Computes the fingerprints of the errors of a file.
+
+    Args:
+        filename: the linted filename.
+        errors: a list of `linter.LintError` instances of the file.
+        content: the value returned by `linter.read_content()` for the file,
+            or `None` if it is not available, in which case the lines are
+            treated as empty.
+        root: the directory the path of the file is relative to.
+
+    Returns:
+        A list of the fingerprint of each error.
+    """
+    lines = list()
+    if errors and isinstance(content, bytes):
+        lines = content.decode('utf8', 'replace').split('\n')
+    fingerprints = list()
+    path = get_path(filename, root) if errors else None
+    for error in errors:
+        line_text = ''
+        if 0 < error.line <= len(lines):
+            line_text = lines[error.line - 1]
+        fingerprints.append(get_fingerprint(path, error.category, line_text))
+    return fingerprints
+
+
+class BaselineIndex(object):
+    """The index of the fingerprints of known findings.
+
+    The fingerprints are kept in a sorted array, where the findings of a
+    fingerprint are found by binary search. When recording, the findings
+    passed to `filter()` are added to the index instead of being looked up,
+    so it can be written as a new baseline.
+    """
+
+    def __init__(self, fingerprints=(), recording=False, root='.'):
+        """Initialization.
+
+        Args:
+            fingerprints: an iterable of the fingerprints of known findings,
+                with a fingerprint repeated for each of its findings. A
+                sorted `array.array` of them, as loaded from a baseline file,
+                is used without being copied.
+            recording: whether to record the filtered findings.
+            root: the directory the paths of the findings are relative to,
+                which is the directory of the baseline file.
+        """
+        if not isinstance(fingerprints, array.array):
+            fingerprints = array.array(_FINGERPRINT_TYPECODE,
+                                       sorted(fingerprints))
+        self.fingerprints = fingerprints
+        self.recording = recording
+        self.root = os.path.abspath(root)
+        self.known_counts = 0
+        # Maps each fingerprint to the number of its findings already used
+        # up by `filter()`.
+        self._used_counts = dict()
+
+    def filter(self, errors, fingerprints):
+        """Drops the known findings of a file.
+
+        Each error uses up one count of its fingerprint, so the findings
+        beyond the number recorded in the baseline are kept.
+
+        Args:
+            errors: a list of `linter.LintError` instances of a file.
+            fingerprints: the list of the fingerprint of each error returned
+                by `get_fingerprints()`.
+
+        Returns:
+            A list of the errors not in the baseline, which is empty when
+            recording.
+        """
+        if self.recording:
+            self.fingerprints.extend(fingerprints)
+            self.known_counts += len(errors)
+            return list()
+        new_errors = list()
+        known_fingerprints = self.fingerprints
+        used_counts = self._used_counts
+        for error, fingerprint in zip(errors, fingerprints):
+            used_count = used_counts.get(fingerprint, 0)
+            index = bisect.bisect_left(known_fingerprints, fingerprint) + \
+                used_count
+            if index < len(known_fingerprints) and \
+               known_fingerprints[index] == fingerprint:
+                used_counts[fingerprint] = used_count + 1
+            else:
+                new_errors.append(error)
+        self.known_counts += len(errors) - len(new_errors)
+        return new_errors
+
+    def write(self, filename):
+        """Writes the fingerprints to a baseline file.
+
+        Args:
+            filename: the filename of the baseline.
+
+        Raises:
+            IOError: if the file cannot be written.
+        """
+        fingerprints = array.array(_FINGERPRINT_TYPECODE,
+                                   sorted(self.fingerprints))
+        if sys.byteorder != 'little':
+            fingerprints.byteswap()
+        with open(filename, 'wb') as baseline_file:
+            baseline_file.write(_BASELINE_HEADER)
+            baseline_file.write(fingerprints.tobytes())
+
+
+def load_baseline(filename):
+    """Loads a baseline file written by `BaselineIndex.write()`.
+
+    Args:
+        filename: the filename of the baseline.
+
+    Returns:
+        A `BaselineIndex` instance, whose paths are relative to the directory
+        of the file.
+
+    Raises:
+        IOError: if the file cannot be read.
+        ValueError: if the file is not a baseline.
+    """
+    with open(filename, 'rb') as baseline_file:
+        content = baseline_file.read()
+    fingerprints = array.array(_FINGERPRINT_TYPECODE)
+    size = len(content) - len(_BASELINE_HEADER)
+    if not content.startswith(_BASELINE_HEADER) or \
+       size % fingerprints.itemsize:
+        raise ValueError('Not a baseline file: {0}'.format(filename))
+    fingerprints.frombytes(content[len(_BASELINE_HEADER):])
+    if sys.byteorder != 'little':
+        fingerprints.byteswap()
+    return BaselineIndex(fingerprints,
+                         root=os.path.dirname(os.path.abspath(filename)))
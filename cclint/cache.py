@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains the persistent cache of the lint results."""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+import cpplint
+
+from cclint import linter
+
+
+# The default maximum total size in bytes of the cached entries.
+_DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+# The default maximum age in seconds of the cached entries.
+_DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+# The suffix of the filename of each cached entry.
+_ENTRY_SUFFIX = '.json'
+# The prefix of the temporary files written before being renamed to entries.
+_TEMP_PREFIX = '.tmp-'
+# Matches the names of the subdirectories holding the entries.
+_ENTRY_DIRNAME_PATTERN = re.compile(r'^[0-9a-f]{2}$')
+# Matches the filenames of the entries and of the temporary files.
+_ENTRY_FILENAME_PATTERN = re.compile(
+    r'^(?:[0-9a-f]{38}' + re.escape(_ENTRY_SUFFIX) + '|' +
+    re.escape(_TEMP_PREFIX) + r'[A-Za-z0-9_]+)$')
+# The version of the format of cached entries. It is a part of the cache keys
+# so entries of other formats are never read.
+_ENTRY_FORMAT_VERSION = 2
+
+
+def _to_json_value(value):
+    """Converts sets to sorted lists so values are dumped consistently."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return value
+
+def _has_noparent(content):
+    """Returns whether a CPPLINT.cfg file stops looking at parent directories.
+
+    The lines are parsed the same way as `config._ConfigFile` does, so
+    comments and values that happen to contain 'set noparent' are ignored.
+
+    Args:
+        content: the content bytes of the CPPLINT.cfg file.
+    """
+    for line in content.decode('utf8', 'replace').splitlines():
+        name = line.partition('#')[0].partition('=')[0]
+        if name.strip() == 'set noparent':
+            return True
+    return False
+
+def _scan_entries(dirname):
+    """Yields the `os.DirEntry` instances of the files owned by the cache.
+
+    Only the entries and temporary files in the two-character subdirectories
+    are yielded. Other files and directories are never touched.
+    """
+    try:
+        with os.scandir(dirname) as entries:
+            subdirs = [entry for entry in entries
+                       if _ENTRY_DIRNAME_PATTERN.match(entry.name) and
+                       entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return
+    for subdir in subdirs:
+        try:
+            with os.scandir(subdir.path) as entries:
+                for entry in entries:
+                    if _ENTRY_FILENAME_PATTERN.match(entry.name) and \
+                       entry.is_file(follow_symlinks=False):
+                        yield entry
+        except OSError:
+            continue
+
+class ResultCache(object):
+    """The content-addressed cache of the lint results.
+
+    Each entry is keyed on the content of the linted file as well as
+    everything that changes cpplint's output: the filename, the cpplint
+    version, cpplint's settings and the content of the `CPPLINT.cfg` files
+    applied to the file. Entries are stored as individual files so multiple
+    processes can share the same cache directory.
+    """
+
+    def __init__(self, dirname, max_size=_DEFAULT_MAX_SIZE,
+                 max_age=_DEFAULT_MAX_AGE):
+        """Initialization.
+
+        Args:
+            dirname: the directory to store the cached entries.
+            max_size: the maximum total size in bytes of the cached entries.
+            max_age: the maximum age in seconds of the cached entries.
+        """
+        self.dirname = dirname
+        self.max_size = max_size
+        self.max_age = max_age
+        self._config_digests = dict()
+
+    def __getstate__(self):
+        """Excludes the config digests from pickling for worker processes."""
+        state = self.__dict__.copy()
+        state['_config_digests'] = dict()
+        return state
+
+    def reset(self):
+        """Forgets the digests of config files so changes are noticed."""
+        self._config_digests = dict()
+
+    def _get_config_digest(self, dirname):
+        """Returns the digest of the config files applied to a directory.
+
+        Args:
+            dirname: the absolute path of the directory.
+
+        Returns:
+            A hex digest string of the content of all `CPPLINT.cfg` files in
+            the directory and its parent directories.
+        """
+        if dirname in self._config_digests:
+            return self._config_digests[dirname]
+
+        # pylint: disable=protected-access
+        hasher = hashlib.sha1()
+        config_path = os.path.join(dirname, cpplint._config_filename)
+        keep_looking = True
+        try:
+            with open(config_path, 'rb') as config_file:
+                content = config_file.read()
+            hasher.update(config_path.encode('utf8') + b'\0' + content)
+            keep_looking = not _has_noparent(content)
+        except (IOError, OSError):
+            pass
+
+        parent_dirname = os.path.dirname(dirname)
+        if keep_looking and parent_dirname != dirname:
+            hasher.update(self._get_config_digest(parent_dirname).encode())
+
+        digest = hasher.hexdigest()
+        self._config_digests[dirname] = digest
+        return digest
+
+    def get_key(self, filename, content=None):
+        """Computes the cache key of a file.
+
+        Args:
+            filename: the filename string to pass to `cpplint.ProcessFile()`.
+            content: the optional value returned by `linter.read_content()`
+                for the file if it is already read.
+
+        Returns:
+            A hex digest string, or `None` if the file cannot be read.
+        """
+        if content is None:
+            content = linter.read_content(filename)
+        if isinstance(content, EnvironmentError):
+            return None
+
+        state = linter.get_cpplint_state()
+        settings = json.dumps(
+            [_ENTRY_FORMAT_VERSION, cpplint.__VERSION__, filename,
+             sorted((name, _to_json_value(value))
+                    for name, value in state.items())],
+            default=_to_json_value)
+        config_digest = self._get_config_digest(
+            os.path.dirname(os.path.abspath(filename)))
+
+        hasher = hashlib.sha1(settings.encode('utf8'))
+        hasher.update(config_digest.encode())
+        hasher.update(hashlib.sha1(content).digest())
+        return hasher.hexdigest()
+
+    def _get_entry_path(self, key):
+        """Returns the path of the entry file of a cache key."""
+        return os.path.join(self.dirname, key[:2], key[2:] + _ENTRY_SUFFIX)
+
+    def get(self, key, filename):
+        """Returns the cached results of a key.
+
+        Args:
+            key: the key returned by `get_key()`.
+            filename: the filename of the key.
+
+        Returns:
+            A tuple of a list of `linter.LintError` instances and the warning
+            message, or `None` if the key is not cached.
+        """
+        path = self._get_entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf8') as entry_file:
+                entry = json.load(entry_file)
+            errors = [linter.LintError(filename, *error)
+                      for error in entry['errors']]
+            warning = entry['warning']
+            # Updates the modification time so recently used entries are
+            # evicted last.
+            os.utime(path, None)
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None
+        return errors, warning
+
+    def set(self, key, errors, warning):
+        """Stores the results of a key.
+
+        The entry is written to a temporary file first and then renamed, so
+        concurrent readers never see a partially written entry.
+
+        Args:
+            key: the key returned by `get_key()`.
+            errors: a list of `linter.LintError` instances.
+            warning: the warning message, or `None`.
+        """
+        path = self._get_entry_path(key)
+        entry_dirname = os.path.dirname(path)
+        try:
+            if not os.path.isdir(entry_dirname):
+                os.makedirs(entry_dirname)
+        except OSError:
+            if not os.path.isdir(entry_dirname):
+                return
+
+        entry = {'errors': [[error.line, error.category, error.confidence,
+                             error.message] for error in errors],
+                 'warning': warning}
+        try:
+            fd, temp_path = tempfile.mkstemp(prefix=_TEMP_PREFIX,
+                                             dir=entry_dirname)
+            with os.fdopen(fd, 'w', encoding='utf8') as entry_file:
+                json.dump(entry, entry_file)
+            os.rename(temp_path, path)
+        except (IOError, OSError):
+            pass
+
+    def evict(self):
+        """Removes the stale entries.
+
+        Entries older than `max_age` are removed first. Then the least
+        recently used entries are removed until the total size is within
+        `max_size`. Only the files written by the cache are considered, so
+        other files in the cache directory are left alone.
+        """
+        expiration_time = time.time() - self.max_age
+        entries = list()
+        total_size = 0
+        for entry in _scan_entries(self.dirname):
+            try:
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime < expiration_time:
+                    os.remove(entry.path)
+                    continue
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+            if total_size <= self.max_size:
+                break
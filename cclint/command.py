@@ -39,29 +39,89 @@ Additional features provided by cclint can be accessed through added flags.
 from __future__ import print_function
 import codecs
 import getopt
-import glob
+import itertools
 import os
+import re
 import sys
 import time
 
 import cpplint
 
+from cclint import exclusion
 from cclint import file_stream
 from cclint import utility
+# The modules of optional features, which are `baseline`, `cache`,
+# `file_list`, `git`, `profiler`, `pruning`, `reporters`, `server`, `shard`
+# and `watch`, are imported only when the features are used to keep the
+# startup fast. `linter` is imported when files are linted.
 
 
 # The long options of cclint that will be passed to `getopt()`.
-_CCLINT_GETOPT_LONG_OPTIONS = ['excludedir=', 'expanddir=']
+_CCLINT_GETOPT_LONG_OPTIONS = ['baseline=', 'cache-dir=', 'changed-since=',
+                               'compile-commands=', 'excludedir=',
+                               'excluderegex=', 'expanddir=', 'file-timeout=',
+                               'files-from=', 'ignore-files', 'jobs=',
+                               'max-file-size=', 'output-format=', 'profile',
+                               'profile-output=', 'progress', 'prune-checks',
+                               'rev=', 'shard=', 'shard-durations=', 'staged',
+                               'watch', 'write-baseline', 'serve', 'client',
+                               'socket=']
+# The long options of the merge subcommand that will be passed to `getopt()`.
+_MERGE_GETOPT_LONG_OPTIONS = ['output-format=', 'progress']
+# The filename passed to cpplint when the files are only specified in file
+# lists.
+_FILE_LIST_PLACEHOLDER = os.devnull
 # The additional usage text that will be added to the display usage text.
 _CCLINT_USAGE = """
   ---------------------------------------------------------------------------
   Flags added by cclint:
 
+    baseline=file
+      Report only the errors not in the specified baseline file, which is
+      written by 'write-baseline'. Errors are matched by their file, category
+      and the text of their lines, so they are still matched after other
+      lines are changed. The files are matched by their paths relative to
+      the directory of the baseline file, so it applies wherever cclint runs
+      from. The exit code is 1 only if there are new errors.
+
+    cache-dir=dir
+      The directory to cache the lint results. A file is not linted again if
+      its content, cpplint's version and settings, and the applied CPPLINT.cfg
+      files are all unchanged since the cached run. Stale results are removed
+      automatically.
+
+    changed-since=ref
+      Lint only the files changed since the specified git revision, plus the
+      untracked files not ignored by git. The file and directory arguments
+      limit which changed files are linted, so '.' lints all changed files
+      within the current directory. The 'excludedir' and 'exclude' flags and
+      the 'extensions' are applied as well.
+
+    client
+      Run through the daemon started with 'serve'. The output and the exit
+      code are the same as running without this flag, which is also what
+      happens when the daemon is not running.
+
+    compile-commands=file
+      Lint the source files compiled in a compilation database such as
+      'compile_commands.json', in addition to the file arguments. Files
+      without matched 'extensions' are skipped. The database is read while
+      linting, so linting starts before a large database is read completely.
+      This flag can be specified multiple times.
+
     excludedir=dir
       The directory to prevent all of its content files from processing. This
       flag can be specified multiple times to have more than one exclude
       directories. It is especially useful when combined with the
-      '--expanddie=recursive' option.
+      '--expanddie=recursive' option. Glob patterns are matched against the
+      directory paths relative to the current directory, where '*' matches
+      within a path component and '**' matches any number of directories.
+
+    excluderegex=pattern
+      The regular expression to prevent matched files and directories from
+      processing. It is searched in the paths relative to the current
+      directory with '/' as the separator. This flag can be specified
+      multiple times.
 
     expanddir=no|yes|recursive
       Decide how to deal with specified directory arguments. By default the
@@ -69,9 +129,137 @@ _CCLINT_USAGE = """
       then it replaces all directory paths with their content files with
       matched 'extensions'. If 'recursive' is provided, then subdirectories
       are also expanded recursively as well.
+
+    file-timeout=seconds
+      The maximum time spent on linting a file. A file taking longer is
+      reported as skipped, and the files skipped by 'file-timeout' and
+      'max-file-size' are listed at the end of the run. It is not supported
+      on Windows.
+
+    files-from=file
+      Lint the files listed in the file, in addition to the file arguments.
+      The paths are separated by null characters, as written by
+      'find -print0' or 'git ls-files -z'. If the file is '-', the list is
+      read from stdin. The list is read while linting, so it is never held in
+      memory as a whole. This flag can be specified multiple times. A file
+      argument starting with '@' is also read as a list of files, with one
+      path per line.
+
+    ignore-files
+      Skip the files and directories ignored by '.gitignore' files and
+      '.cclintignore' files, which have the same syntax, when expanding
+      directories with 'expanddir'. The ignore files are loaded from each
+      expanded directory and its parent directories within the git
+      repository, as well as '.git/info/exclude'. The rules of
+      '.cclintignore' take precedence over '.gitignore' in the same
+      directory. Ignored directories are never walked.
+
+    jobs=N
+      The number of processes used to lint files in parallel. By default the
+      value is the number of CPUs. The output is always printed in the same
+      order as processing files one by one with 'jobs=1'.
+
+    max-file-size=bytes
+      The maximum size of a file to lint. Larger files are reported as
+      skipped without being linted. Files read from stdin are not limited.
+
+    output-format=pretty|jsonl|sarif|junit
+      The format of the results printed to stdout. By default the value is
+      'pretty' which prints the human-readable results with ANSI colors. If
+      'jsonl' is provided, then each error is printed as a JSON object per
+      line, followed by a JSON object summarizing each file. If 'sarif' or
+      'junit' is provided, then the results are printed as a SARIF 2.1.0 log
+      or a JUnit XML report respectively.
+
+    profile[=N]
+      Print the wall and CPU time of each stage, the N slowest files, the
+      throughput and the number of errors per category to stderr after the
+      files are linted. By default the 10 slowest files are printed. The
+      files are collected before linting starts.
+
+    profile-output=file
+      Write the profile to the file, which implies 'profile'. A Chrome trace
+      of the stages and the files is written if the file ends with '.json',
+      which can be loaded in chrome://tracing. Otherwise a pstats dump of
+      cProfile is written, which only covers the main process unless
+      'jobs=1' is specified.
+
+    progress
+      Print only the files with errors or warnings, and show a live count of
+      the checked files on the terminal. It only applies to the 'pretty'
+      output format.
+
+    prune-checks
+      Skip running the cpplint checks whose error categories are all
+      filtered out by 'filter' and the CPPLINT.cfg files of each file. Checks
+      affecting other checks, such as the include order and NOLINT comments,
+      always run. The reported errors are the same as without this flag.
+
+    rev=tree-ish
+      Lint the files of a git revision, such as a tag or a commit, without
+      checking it out. The file and directory arguments limit which files of
+      the revision are linted, so '.' lints all files within the current
+      directory. The contents are read from git, while the CPPLINT.cfg files
+      are read from the working tree.
+
+    serve
+      Run as a daemon listening on a Unix domain socket with cpplint loaded,
+      so 'client' invocations start in a few milliseconds. Other flags and
+      files are ignored. Press Ctrl-C to stop.
+
+    shard=index/count
+      Lint only the files of a shard, where 'index' is from 1 to 'count'.
+      The files are split deterministically with the total size of the files
+      in each shard balanced. Run with '--output-format=jsonl' on each
+      machine and combine the results with 'cclint merge'.
+
+    shard-durations=file
+      Balance the shards by the durations of linting each file recorded in a
+      Chrome trace written by 'profile-output' of a previous run instead of
+      by the file sizes. The files not in the trace are estimated by their
+      sizes.
+
+    socket=path
+      The path of the daemon's socket used by 'serve' and 'client'. By
+      default it is 'cclint.sock' in $XDG_RUNTIME_DIR, or
+      '/tmp/cclint-<uid>/cclint.sock'.
+
+    staged
+      Lint the staged contents of the files in the git index instead of the
+      working tree, which is what a pre-commit hook should check. The file
+      and directory arguments are handled like 'rev'.
+
+    watch
+      Keep running after all files are linted, and lint files again as soon as
+      they are changed, added or removed. Files are watched with inotify if
+      the 'inotify_simple' package is installed, otherwise they are polled.
+      In a terminal, the current results are redrawn after each change.
+      It only applies to the 'pretty' output format. Press Ctrl-C to stop.
+
+    write-baseline
+      Write all found errors to the file specified by 'baseline' instead of
+      reporting them, so later runs with 'baseline' report only new errors.
+
+  Subcommands added by cclint:
+
+    cclint merge [--output-format=pretty|jsonl|sarif|junit] [--progress]
+                 file...
+      Combine the results of shards written by '--output-format=jsonl' into
+      one report. The exit code is 1 if any shard has errors.
 """
 # The syntax that will be added to the displayed usage text.
-_CCLINT_SYNTAX = "               [--expanddir=no|yes|recursive]"
+_CCLINT_SYNTAX = """\
+               [--excludedir=dir] [--excluderegex=pattern]
+               [--expanddir=no|yes|recursive] [--ignore-files]
+               [--files-from=file] [--compile-commands=file] [@file]
+               [--jobs=N] [--cache-dir=dir] [--changed-since=ref]
+               [--file-timeout=seconds] [--max-file-size=bytes]
+               [--output-format=pretty|jsonl|sarif|junit] [--progress]
+               [--profile[=N]] [--profile-output=file] [--prune-checks]
+               [--rev=tree-ish] [--staged]
+               [--baseline=file] [--write-baseline]
+               [--shard=index/count] [--shard-durations=file]
+               [--watch] [--serve] [--client] [--socket=path]"""
 
 
 def parse_arguments():
@@ -91,7 +279,8 @@ def parse_arguments():
         else:
             cclint_options.append(signature)
 
-    # Separates cpplint's and cclint's arguments.
+    # Separates cpplint's and cclint's arguments. The response files are
+    # passed as the file lists of cclint.
     cclint_args = list()
     cpplint_args = list()
     for arg in sys.argv[1:]:
@@ -100,25 +289,32 @@ def parse_arguments():
             if option_name in cclint_options:
                 cclint_args.append(arg)
                 continue
+        elif arg.startswith('@') and len(arg) > 1:
+            cclint_args.append('--response-file=' + arg[1:])
+            continue
         cpplint_args.append(arg)
 
     # Parses cclint's arguments.
     options = parse_cclint_arguments(cclint_args)
 
+    # cpplint exits if no files are specified, which is allowed when the
+    # files are listed in files, so a placeholder is passed and removed.
+    if options['file_lists']:
+        cpplint_args.append(_FILE_LIST_PLACEHOLDER)
+
     # Parses cpplint's arguments and filters passed filenames within the
     # exclude directories.
-    filenames = list()
-    for filename in cpplint.ParseArguments(cpplint_args):
-        # Skips the file if it's in a exclude directory.
-        is_excluded = False
-        for exclude_dir in options['excludedirs']:
-            if (filename.startswith(exclude_dir)):
-                is_excluded = True
-                break
-        if is_excluded:
-            continue
-
-        filenames.append(filename)
+    filenames = cpplint.ParseArguments(cpplint_args)
+    if options['file_lists'] and _FILE_LIST_PLACEHOLDER in filenames:
+        filenames.remove(_FILE_LIST_PLACEHOLDER)
+    exclusion_index = options['exclusion']
+    filenames = [filename for filename in filenames
+                 if not exclusion_index.is_excluded(filename)]
+    if '-' in filenames and ('files-from', '-') in options['file_lists']:
+        cpplint.PrintUsage('stdin cannot be both a file and a list of files')
+    if '-' in filenames and options['revision'] is not None:
+        cpplint.PrintUsage('stdin cannot be linted with the rev and staged '
+                           'flags')
 
     return options, filenames
 
@@ -131,22 +327,143 @@ def parse_cclint_arguments(args):
     Returns:
         A dict of parsed cclint arguments.
     """
+    # getopt does not support the optional value of the profile flag, so the
+    # value is passed as an internal flag.
+    args = ['--profile-files=' + arg[len('--profile='):]
+            if arg.startswith('--profile=') else arg for arg in args]
     try:
-        opts = getopt.getopt(args, '', _CCLINT_GETOPT_LONG_OPTIONS)[0]
+        opts = getopt.getopt(args, '', _CCLINT_GETOPT_LONG_OPTIONS +
+                             ['profile-files=', 'response-file='])[0]
     except getopt.GetoptError:
         cpplint.PrintUsage('Invalid arguments.')
 
-    options = {'excludedirs': set(), 'expanddir': 'no'}
+    options = {'baseline': None, 'cache_dir': None, 'changed_since': None,
+               'exclusion': exclusion.ExclusionIndex(), 'expanddir': 'no',
+               'file_lists': list(), 'file_timeout': None,
+               'ignore_files': False, 'jobs': os.cpu_count() or 1,
+               'max_file_size': None, 'output_format': 'pretty',
+               'profile': False, 'profile_files': None,
+               'profile_output': None, 'progress': False,
+               'prune_checks': False, 'revision': None, 'shard': None,
+               'shard_durations': None, 'watch': False,
+               'write_baseline': False}
     for (opt, val) in opts:
-        if opt == '--expanddir':
+        if opt == '--baseline':
+            options['baseline'] = val
+        elif opt == '--cache-dir':
+            options['cache_dir'] = val
+        elif opt == '--changed-since':
+            options['changed_since'] = val
+        elif opt in ('--compile-commands', '--files-from',
+                     '--response-file'):
+            options['file_lists'].append((opt[2:], val))
+        elif opt == '--expanddir':
             if val not in ('no', 'yes', 'recursive'):
                 cpplint.PrintUsage('The only allowed expanddir formats are '
                                    'no, yes and recursive')
             options['expanddir'] = val
         elif opt == '--excludedir':
-            for dirname in glob.iglob(val):
-                if os.path.isdir(dirname):
-                    options['excludedirs'].add(os.path.relpath(dirname))
+            options['exclusion'].add_dir_glob(val)
+        elif opt == '--excluderegex':
+            try:
+                options['exclusion'].add_regex(val)
+            except re.error:
+                cpplint.PrintUsage('Invalid excluderegex pattern.')
+        elif opt == '--file-timeout':
+            try:
+                options['file_timeout'] = float(val)
+            except ValueError:
+                cpplint.PrintUsage('File timeout must be a number.')
+            if not options['file_timeout'] > 0:
+                cpplint.PrintUsage('File timeout must be a positive number.')
+            import signal
+            if not hasattr(signal, 'setitimer'):
+                cpplint.PrintUsage('The file-timeout flag is not supported '
+                                   'on this platform')
+        elif opt == '--ignore-files':
+            options['ignore_files'] = True
+        elif opt == '--jobs':
+            try:
+                options['jobs'] = int(val)
+            except ValueError:
+                cpplint.PrintUsage('Jobs must be digits.')
+            if options['jobs'] < 1:
+                cpplint.PrintUsage('Jobs must be a positive number.')
+        elif opt == '--max-file-size':
+            try:
+                options['max_file_size'] = int(val)
+            except ValueError:
+                cpplint.PrintUsage('Max file size must be digits.')
+            if options['max_file_size'] < 0:
+                cpplint.PrintUsage('Max file size must not be negative.')
+        elif opt == '--output-format':
+            if val != 'pretty':
+                from cclint import reporters
+                if val not in reporters.REPORTERS:
+                    cpplint.PrintUsage('The only allowed output-format '
+                                       'formats are pretty, jsonl, sarif and '
+                                       'junit')
+            options['output_format'] = val
+        elif opt == '--profile':
+            options['profile'] = True
+        elif opt == '--profile-files':
+            options['profile'] = True
+            try:
+                options['profile_files'] = int(val)
+            except ValueError:
+                cpplint.PrintUsage('Profile must be digits.')
+            if options['profile_files'] < 1:
+                cpplint.PrintUsage('Profile must be a positive number.')
+        elif opt == '--profile-output':
+            options['profile'] = True
+            options['profile_output'] = val
+        elif opt == '--progress':
+            options['progress'] = True
+        elif opt == '--prune-checks':
+            options['prune_checks'] = True
+        elif opt in ('--rev', '--staged'):
+            from cclint import git
+            if options['revision'] is not None:
+                cpplint.PrintUsage('Only one of the rev and staged flags can '
+                                   'be specified')
+            options['revision'] = git.Revision(val if opt == '--rev' else
+                                               None)
+        elif opt == '--shard':
+            from cclint import shard
+            try:
+                options['shard'] = shard.parse_shard(val)
+            except ValueError:
+                cpplint.PrintUsage('Shard must be index/count with index '
+                                   'from 1 to count')
+        elif opt == '--shard-durations':
+            options['shard_durations'] = val
+        elif opt == '--watch':
+            options['watch'] = True
+        elif opt == '--write-baseline':
+            options['write_baseline'] = True
+    if options['watch'] and options['output_format'] != 'pretty':
+        cpplint.PrintUsage('The watch flag only applies to the pretty '
+                           'output-format')
+    if options['watch'] and options['profile']:
+        cpplint.PrintUsage('The profile flag does not apply to watch')
+    if options['watch'] and options['shard'] is not None:
+        cpplint.PrintUsage('The shard flag does not apply to watch')
+    if options['file_lists'] and options['changed_since'] is not None:
+        cpplint.PrintUsage('The changed-since flag does not apply to the '
+                           'listed files')
+    if ('files-from', '-') in options['file_lists'] and options['watch']:
+        cpplint.PrintUsage('The watch flag does not apply to the files read '
+                           'from stdin')
+    if options['revision'] is not None and \
+       (options['watch'] or options['file_lists'] or
+            options['changed_since'] is not None):
+        cpplint.PrintUsage('The rev and staged flags do not apply to watch, '
+                           'changed-since and the listed files')
+    if options['write_baseline'] and options['baseline'] is None:
+        cpplint.PrintUsage('The write-baseline flag requires the baseline '
+                           'flag')
+    if options['watch'] and options['baseline'] is not None:
+        cpplint.PrintUsage('The baseline flag does not apply to watch')
     return options
 
 def execute_from_command_line():
@@ -155,49 +472,230 @@ def execute_from_command_line():
     This function is the entry point of the cclint client.
     """
     start_time = time.time()
+    args = sys.argv[1:]
+    # The flags of the daemon handled by `server.parse_arguments()`.
+    if any(arg in ('--serve', '--client') or arg.startswith('--socket=')
+           for arg in args):
+        from cclint import server
+        mode, socket_path, args = server.parse_arguments(args)
+        if mode == 'serve':
+            server.serve(socket_path, execute_from_command_line)
+            return
+        elif mode == 'client':
+            exit_code = server.run_client(socket_path, args)
+            if exit_code is not None:
+                sys.exit(exit_code)
+        sys.argv[1:] = args
+
     update_cpplint_usage()
+    if args[:1] == ['merge']:
+        merge_results(args[1:], start_time)
     options, cpplint_filenames = parse_arguments()
 
-    exclude_paths = [os.path.abspath(f) for f in cpplint._excludes or []]
-
-    # Determines the list of filenames to process.
-    if options['expanddir'] == 'no':
-        filenames = cpplint_filenames
-    else:
-        filenames = list()
-        recursive = (options['expanddir'] == 'recursive')
-        expand_directory = utility.expand_directory
-
-        for filename in cpplint_filenames:
-            if os.path.isfile(filename):
-                filenames.append(filename)
-            elif os.path.isdir(filename):
-                expanded_filenames = expand_directory(filename,
-                                                      None,
-                                                      recursive,
-                                                      options['excludedirs'],
-                                                      exclude_paths)
-                filenames.extend(expanded_filenames)
-
-    # Prints the cclint's header message.
+    exclusion_index = options['exclusion']
+    for path in cpplint._excludes or []:
+        exclusion_index.add_path(path)
+
+    filenames = collect_filenames(options, cpplint_filenames)
+    profile = None
+    if options['profile']:
+        from cclint import profiler
+        profile = profiler.Profiler(start_time, options['profile_output'],
+                                    options['profile_files'])
+        # The CPU time of the startup includes importing the modules.
+        profile.add_stage('startup', start_time, time.time() - start_time,
+                          time.process_time())
+        with profile.stage('discovery'):
+            filenames = list(filenames)
+    if options['shard'] is not None:
+        filenames = select_shard(options, filenames)
+
+    stream = create_stream(options['output_format'], options['progress'])
+
+    from cclint import linter
+    cpplint_state = cpplint._CppLintState()  # pylint: disable=protected-access
+    cpplint_state.ResetErrorCounts()
+    result_cache = None
+    if options['cache_dir'] is not None:
+        from cclint import cache
+        result_cache = cache.ResultCache(options['cache_dir'])
+    guard = None
+    if options['file_timeout'] is not None or \
+       options['max_file_size'] is not None:
+        guard = linter.FileGuard(options['file_timeout'],
+                                 options['max_file_size'])
+    pruner = None
+    if options['prune_checks']:
+        from cclint import pruning
+        pruner = pruning.CheckPruner()
+    if options['watch']:
+        from cclint import watch
+        watcher = watch.Watcher(
+            lambda on_directory: collect_filenames(
+                options, cpplint_filenames, on_directory),
+            cpplint_state.verbose_level, stream, result_cache, guard, pruner,
+            options['jobs'])
+        watcher.run()
+        stream.finish()
+        sys.exit(watcher.total_error_counts > 0)
+
+    # Reading stdin is only possible in the current process.
+    jobs = 1 if '-' in cpplint_filenames else options['jobs']
+    timings = None if profile is None else dict()
+    reader = None
+    # No error is caught unless the files are read from git.
+    git_errors = ()
+    if options['revision'] is not None:
+        from cclint import git
+        reader = options['revision'].read_files
+        git_errors = git.GitError
+    baseline_index = None
+    if options['write_baseline']:
+        from cclint import baseline
+        baseline_index = baseline.BaselineIndex(
+            recording=True,
+            root=os.path.dirname(os.path.abspath(options['baseline'])))
+    elif options['baseline'] is not None:
+        from cclint import baseline
+        try:
+            baseline_index = baseline.load_baseline(options['baseline'])
+        except (IOError, ValueError) as error:
+            sys.exit('\nFATAL ERROR: Cannot load the baseline: ' +
+                     str(error))
+    results = linter.lint_files(filenames, cpplint_state.verbose_level, jobs,
+                                result_cache, timings, guard, pruner, reader,
+                                baseline_index)
+    if profile is not None:
+        results = profile.iterate_results(results, timings)
+    try:
+        for filename, errors, warning in results:
+            stream.report(filename, errors, warning)
+    except git_errors as error:
+        sys.exit('\nFATAL ERROR: ' + str(error))
+    if result_cache is not None:
+        result_cache.evict()
+    if options['write_baseline']:
+        try:
+            baseline_index.write(options['baseline'])
+        except IOError as error:
+            sys.exit('\nFATAL ERROR: Cannot write the baseline: ' +
+                     str(error))
+
+    stream.finish()
+    total_error_counts = stream.total_error_counts
+    if options['output_format'] == 'pretty':
+        print_footer(start_time, total_error_counts, stream.guarded_files,
+                     0 if baseline_index is None else
+                     baseline_index.known_counts)
+    if profile is not None:
+        profile.finish()
+    sys.exit(total_error_counts > 0)
+
+def create_stream(output_format, progress):
+    """Creates the stream to report the results of each file.
+
+    The header is printed for the 'pretty' output format, and the beginning
+    of the results is written for other formats.
+
+    Args:
+        output_format: the value of the `output-format` flag.
+        progress: whether to only print the files with errors or warnings.
+
+    Returns:
+        A `file_stream.FileStream` instance or a reporter instance.
+    """
+    if output_format == 'pretty':
+        print_header()
+        # Initializes the stream for formatting cpplint's output.
+        return file_stream.FileStream(sys.stderr,
+                                      codecs.getreader('utf8'),
+                                      codecs.getwriter('utf8'),
+                                      'replace',
+                                      progress=progress,
+                                      quiet=cpplint._cpplint_state.quiet)
+    from cclint import reporters
+    stream = reporters.REPORTERS[output_format](sys.stdout)
+    stream.start()
+    return stream
+
+def select_shard(options, filenames):
+    """Selects the filenames of the shard specified by the `shard` flag.
+
+    Args:
+        options: the dict of cclint's options.
+        filenames: an iterable of all filenames to process.
+
+    Returns:
+        A list of the filenames of the shard.
+    """
+    from cclint import shard
+    durations = None
+    if options['shard_durations'] is not None:
+        try:
+            durations = shard.load_durations(options['shard_durations'])
+        except (IOError, KeyError, TypeError, ValueError) as error:
+            sys.exit('\nFATAL ERROR: Cannot load the shard durations: ' +
+                     str(error))
+    index, count = options['shard']
+    return shard.select_shard(filenames, index, count, durations)
+
+def merge_results(args, start_time):
+    """Executes the merge subcommand and exits.
+
+    Args:
+        args: a list of the arguments after 'merge'.
+        start_time: the time when the cclint started.
+    """
+    try:
+        opts, filenames = getopt.getopt(args, '', _MERGE_GETOPT_LONG_OPTIONS)
+    except getopt.GetoptError:
+        cpplint.PrintUsage('Invalid arguments.')
+    output_format = 'pretty'
+    progress = False
+    for (opt, val) in opts:
+        if opt == '--output-format':
+            output_format = parse_cclint_arguments([opt + '=' + val])[
+                'output_format']
+        elif opt == '--progress':
+            progress = True
+    if not filenames:
+        cpplint.PrintUsage('No result files were specified.')
+
+    from cclint import shard
+    try:
+        results = shard.read_results(filenames)
+    except (IOError, KeyError, TypeError, ValueError) as error:
+        sys.exit('\nFATAL ERROR: Cannot read the results: ' + str(error))
+
+    stream = create_stream(output_format, progress)
+    for filename, errors, warning in results:
+        stream.report(filename, errors, warning)
+    stream.finish()
+    if output_format == 'pretty':
+        print_footer(start_time, stream.total_error_counts,
+                     stream.guarded_files)
+    sys.exit(stream.total_error_counts > 0)
+
+def print_header():
+    """Prints the cclint's header message."""
     print(utility.get_ansi_code('FOREGROUND_CYAN') +
           utility.get_ansi_code('STYLE_BRIGHT') +
           '\n=== CCLINT ===' +
           utility.get_ansi_code('FOREGROUND_RESET') +
           utility.get_ansi_code('STYLE_RESET_ALL'))
 
-    # Initializes the stream for intercepting and formatting cpplint's output.
-    stream = file_stream.FileStream(sys.stderr,
-                                    codecs.getreader('utf8'),
-                                    codecs.getwriter('utf8'),
-                                    'replace')
-    cpplint_state = cpplint._CppLintState()  # pylint: disable=protected-access
-    cpplint_state.ResetErrorCounts()
-    for filename in filenames:
-        stream.begin(filename)
-        cpplint.ProcessFile(filename, cpplint_state.verbose_level)
-        stream.end()
+def print_footer(start_time, total_error_counts, guarded_files=(),
+                 known_error_counts=0):
+    """Prints the cclint's succeeded message and the number of errors.
 
+    Args:
+        start_time: the time when the cclint started.
+        total_error_counts: the total number of found errors.
+        guarded_files: the filenames skipped by the `file-timeout` and
+            `max-file-size` flags.
+        known_error_counts: the number of errors not reported because they
+            are in the baseline, or written to it.
+    """
     # Prints the succeeded messages.
     print(utility.get_ansi_code('FOREGROUND_GREEN') +
           utility.get_ansi_code('STYLE_BRIGHT') +
@@ -208,12 +706,136 @@ def execute_from_command_line():
           utility.get_ansi_code('FOREGROUND_RESET') +
           utility.get_ansi_code('STYLE_RESET_ALL'))
     # Shows how many errors are found.
-    total_error_counts = stream.total_error_counts
     if total_error_counts:
         print(utility.get_ansi_code('FOREGROUND_RED') +
               'Total errors found: {0:d}'.format(total_error_counts))
+    # Shows how many errors are hidden by the baseline.
+    if known_error_counts:
+        print(utility.get_ansi_code('FOREGROUND_RESET') +
+              'Known errors in the baseline: {0:d}'.format(
+                  known_error_counts))
+    # Lists the files that are not linted completely.
+    if guarded_files:
+        print(utility.get_ansi_code('FOREGROUND_MAGENTA') +
+              'Files skipped by guards: {0:d}'.format(len(guarded_files)) +
+              utility.get_ansi_code('FOREGROUND_RESET'))
+        for filename in guarded_files:
+            print('  ' + filename)
     print(utility.get_ansi_code('FOREGROUND_RESET') + 'Done.\n')
-    sys.exit(total_error_counts > 0)
+
+def collect_filenames(options, cpplint_filenames, on_directory=None):
+    """Determines the filenames to process.
+
+    Args:
+        options: the dict of cclint's options.
+        cpplint_filenames: the list of filenames returned by
+            `parse_arguments()`.
+        on_directory: an optional callable called with each walked
+            directory.
+
+    Returns:
+        An iterable of filenames to process.
+    """
+    exclusion_index = options['exclusion']
+    filenames = cpplint_filenames
+    if options['file_lists']:
+        filenames = itertools.chain(cpplint_filenames,
+                                    iterate_file_lists(options))
+    if options['revision'] is not None:
+        from cclint import git
+        try:
+            revision_filenames = options['revision'].list_files(
+                cpplint_filenames)
+        except git.GitError as error:
+            sys.exit('\nFATAL ERROR: ' + str(error))
+        # The files may not exist in the working tree.
+        valid_extensions = cpplint.GetAllExtensions()
+        return [filename for filename in revision_filenames
+                if os.path.splitext(filename)[1][1:] in valid_extensions and
+                not exclusion_index.is_excluded(filename)]
+    elif options['changed_since'] is not None:
+        from cclint import git
+        try:
+            changed_filenames = git.get_changed_files(options['changed_since'])
+        except git.GitError as error:
+            sys.exit('\nFATAL ERROR: ' + str(error))
+        return utility.filter_filenames(
+            [filename for filename in changed_filenames
+             if is_within_paths(filename, cpplint_filenames)],
+            exclusion_index)
+    elif options['expanddir'] == 'no':
+        return filenames
+    return expand_filenames(filenames,
+                            options['expanddir'] == 'recursive',
+                            exclusion_index, options['ignore_files'],
+                            on_directory)
+
+def iterate_file_lists(options):
+    """Reads the files listed by `files-from`, `compile-commands` and '@'.
+
+    Args:
+        options: the dict of cclint's options.
+
+    Yields:
+        The listed filenames that are not excluded.
+    """
+    from cclint import file_list
+    readers = {'compile-commands': file_list.read_compile_commands,
+               'files-from': file_list.read_null_delimited,
+               'response-file': file_list.read_response_file}
+    exclusion_index = options['exclusion']
+    for kind, list_filename in options['file_lists']:
+        try:
+            for filename in readers[kind](list_filename):
+                if not exclusion_index.is_excluded(filename):
+                    yield filename
+        except (IOError, KeyError, TypeError, ValueError) as error:
+            sys.exit('\nFATAL ERROR: Cannot read the list of files {0}: '
+                     '{1}'.format(list_filename, error))
+
+def expand_filenames(filenames, recursive, exclusion_index,
+                     ignore_files=False, on_directory=None):
+    """Replaces directories with their content files.
+
+    Args:
+        filenames: a list of file and directory paths.
+        recursive: whether to expand subdirectories recursively.
+        exclusion_index: an `exclusion.ExclusionIndex` instance of the
+            excluded files and directories.
+        ignore_files: whether to skip the files and directories ignored by
+            ignore files.
+        on_directory: an optional callable called with each walked
+            directory.
+
+    Yields:
+        The filenames to process. Files are yielded while directories are
+        being walked, so linting can start before the walk finishes.
+    """
+    for filename in filenames:
+        if os.path.isfile(filename):
+            yield filename
+        elif os.path.isdir(filename):
+            for expanded_filename in utility.expand_directory(
+                    filename, recursive, exclusion_index, ignore_files,
+                    on_directory):
+                yield expanded_filename
+
+def is_within_paths(filename, paths):
+    """Checks whether a file is one of or within the specified paths.
+
+    Args:
+        filename: the filename to check.
+        paths: a list of file or directory paths.
+
+    Returns:
+        True if the file equals to a path or is within a directory path.
+    """
+    filename = os.path.abspath(filename)
+    for path in paths:
+        path = os.path.abspath(path)
+        if filename == path or filename.startswith(os.path.join(path, '')):
+            return True
+    return False
 
 def update_cpplint_usage():
     """Update the usage text defined in cpplint."""
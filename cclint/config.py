@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains the cache of CPPLINT.cfg files.
+
+`cpplint.ProcessConfigOverrides()` reads and parses every CPPLINT.cfg file in
+the parent directories of each processed file. The cache parses each file
+once and applies its options the same way for every file in the directory
+and its subdirectories. A file is parsed again if its modification time or
+size changes, which is checked once per directory after each `refresh()`.
+"""
+
+import codecs
+import os
+import re
+import stat
+
+import cpplint
+
+
+def _get_signature(path):
+    """Returns the modification time and size of a file, or `None`."""
+    try:
+        path_stat = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(path_stat.st_mode):
+        return None
+    return (path_stat.st_mtime_ns, path_stat.st_size)
+
+class _ConfigFile(object):
+    """The parsed options of a CPPLINT.cfg file, or of its absence."""
+
+    __slots__ = ('path', 'signature', 'options', 'readable', 'generation')
+
+    def __init__(self, path, generation):
+        """Initialization.
+
+        Args:
+            path: the path of the CPPLINT.cfg file.
+            generation: the generation of the cache when the file is read.
+        """
+        self.path = path
+        self.generation = generation
+        self.signature = _get_signature(path)
+        # A list of tuples of the name and the value of each option in the
+        # order of the file. The pattern of 'exclude_files' is compiled.
+        self.options = list()
+        self.readable = True
+        if self.signature is None:
+            return
+        try:
+            with codecs.open(path, 'r', 'utf8', 'replace') as config_file:
+                for line in config_file:
+                    line = line.partition('#')[0]
+                    if not line.strip():
+                        continue
+                    name, _, value = line.partition('=')
+                    name = name.strip()
+                    value = value.strip()
+                    if name == 'exclude_files':
+                        value = re.compile(value)
+                    self.options.append((name, value))
+        except (IOError, OSError):
+            self.readable = False
+
+    def apply(self, base_name, filters):
+        """Applies the options to cpplint's settings.
+
+        This method does what `cpplint.ProcessConfigOverrides()` does with a
+        CPPLINT.cfg file, except that excluded files are never reported.
+
+        Args:
+            base_name: the name of the path component of `filename` within
+                the directory of the CPPLINT.cfg file.
+            filters: the list to append the filters of the file.
+
+        Returns:
+            A tuple of whether the file is excluded and whether the files in
+            the parent directories should be applied.
+        """
+        # pylint: disable=protected-access
+        if not self.readable:
+            cpplint._cpplint_state.PrintError(
+                "Skipping config file '{0}': Can't open for reading\n".format(
+                    self.path))
+            return False, False
+
+        keep_looking = True
+        for name, value in self.options:
+            if name == 'set noparent':
+                keep_looking = False
+            elif name == 'filter':
+                filters.append(value)
+            elif name == 'exclude_files':
+                if value.match(base_name):
+                    return True, False
+            elif name == 'linelength':
+                try:
+                    cpplint._line_length = int(value)
+                except ValueError:
+                    cpplint._cpplint_state.PrintError(
+                        'Line length must be numeric.')
+            elif name == 'extensions':
+                cpplint.ProcessExtensionsOption(value)
+            elif name == 'root':
+                cpplint._root = os.path.join(os.path.dirname(self.path),
+                                             value)
+            elif name == 'headers':
+                cpplint.ProcessHppHeadersOption(value)
+            elif name == 'includeorder':
+                cpplint.ProcessIncludeOrderOption(value)
+            else:
+                cpplint._cpplint_state.PrintError(
+                    'Invalid configuration option ({0}) in file {1}\n'.format(
+                        name, self.path))
+        return False, keep_looking
+
+
+class ConfigCache(object):
+    """The cache of the CPPLINT.cfg files of directories."""
+
+    def __init__(self):
+        """Initialization."""
+        # Maps the path of each CPPLINT.cfg file to a `_ConfigFile` instance.
+        self._files = dict()
+        self._generation = 0
+
+    def refresh(self):
+        """Checks whether each cached file is changed again on next use."""
+        self._generation += 1
+
+    def _get_file(self, dirname):
+        """Returns the `_ConfigFile` instance of a directory."""
+        # pylint: disable=protected-access
+        path = os.path.join(dirname, cpplint._config_filename)
+        config_file = self._files.get(path)
+        if config_file is not None and \
+           config_file.generation != self._generation:
+            if _get_signature(path) == config_file.signature:
+                config_file.generation = self._generation
+            else:
+                config_file = None
+        if config_file is None:
+            config_file = self._files[path] = _ConfigFile(path,
+                                                          self._generation)
+        return config_file
+
+    def apply(self, filename):
+        """Applies the CPPLINT.cfg files of a file to cpplint's settings.
+
+        The result is the same as calling `cpplint.ProcessConfigOverrides()`
+        with `quiet` set.
+
+        Args:
+            filename: the filename whose parent directories are searched for
+                CPPLINT.cfg files.
+
+        Returns:
+            False if the file is excluded by a CPPLINT.cfg file, otherwise
+            True.
+        """
+        # pylint: disable=protected-access
+        filters = list()
+        dirname, base_name = os.path.split(os.path.abspath(filename))
+        while base_name:
+            config_file = self._get_file(dirname)
+            if config_file.signature is not None:
+                excluded, keep_looking = config_file.apply(base_name,
+                                                           filters)
+                if excluded:
+                    return False
+                if not keep_looking:
+                    break
+            dirname, base_name = os.path.split(dirname)
+
+        # The filters of the files in parent directories have lower priority.
+        for config_filter in reversed(filters):
+            cpplint._AddFilters(config_filter)
+        return True
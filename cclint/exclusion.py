@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains the index of excluded paths and patterns."""
+
+import glob
+import os
+import re
+
+
+# The value of a trie node indicating that the path and everything within it
+# is excluded.
+_EXCLUDED = True
+
+
+def _split_path(path):
+    """Splits an absolute path into a list of normalized components."""
+    path = os.path.normcase(os.path.abspath(path))
+    return [component for component in path.split(os.sep) if component]
+
+def translate_glob(pattern):
+    """Translates a glob pattern into a regular expression string.
+
+    Unlike `fnmatch.translate()`, `*` and `?` do not match the path
+    separator, while `**` matches any number of directories.
+
+    Args:
+        pattern: the glob pattern relative to the current directory.
+
+    Returns:
+        A regular expression string that matches the whole path.
+    """
+    pattern = os.path.normpath(pattern).replace(os.sep, '/')
+    index = 0
+    result = list()
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith('**/', index):
+            result.append('(?:.*/)?')
+            index += 3
+            continue
+        elif pattern.startswith('**', index):
+            result.append('.*')
+            index += 2
+            continue
+        elif char == '*':
+            result.append('[^/]*')
+        elif char == '?':
+            result.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', index + 2)
+            if end == -1:
+                result.append(re.escape(char))
+            else:
+                chars = pattern[index + 1:end]
+                if chars.startswith('!'):
+                    chars = '^' + chars[1:]
+                result.append('[' + chars.replace('\\', '\\\\') + ']')
+                index = end
+        else:
+            result.append(re.escape(char))
+        index += 1
+    return ''.join(result) + r'\Z'
+
+class ExclusionIndex(object):
+    """The index to check whether paths are excluded from linting.
+
+    Excluded paths are stored in a trie of path components, so checking a
+    path takes time proportional to its depth regardless of how many paths
+    are excluded, and `src/foo` never excludes `src/foobar`. Glob patterns of
+    directories and regular expressions of paths are compiled into a single
+    regular expression each. Patterns are matched against paths relative to
+    the current directory with `/` as the separator.
+    """
+
+    def __init__(self):
+        """Initialization."""
+        self.trie = dict()
+        self._cwd = os.getcwd()
+        self._dir_patterns = list()
+        self._path_patterns = list()
+        self._dir_regex = None
+        self._path_regex = None
+
+    @property
+    def has_patterns(self):
+        """Whether any glob patterns or regular expressions are added."""
+        return bool(self._dir_patterns or self._path_patterns)
+
+    def add_path(self, path):
+        """Excludes a file or a directory including everything within it.
+
+        Args:
+            path: the path to exclude.
+        """
+        node = self.trie
+        components = _split_path(path)
+        for component in components[:-1]:
+            child = node.get(component)
+            if child is _EXCLUDED:
+                return
+            if child is None:
+                child = node[component] = dict()
+            node = child
+        if components:
+            node[components[-1]] = _EXCLUDED
+
+    def add_dir_glob(self, pattern):
+        """Excludes the directories matching a glob pattern.
+
+        Args:
+            pattern: the glob pattern relative to the current directory.
+        """
+        if not glob.has_magic(pattern):
+            self.add_path(pattern)
+            return
+        self._dir_patterns.append(translate_glob(pattern))
+        self._dir_regex = re.compile('|'.join(
+            '(?:{0})'.format(p) for p in self._dir_patterns))
+
+    def add_regex(self, pattern):
+        """Excludes the files and directories matching a regular expression.
+
+        Args:
+            pattern: the regular expression searched in the relative paths.
+
+        Raises:
+            re.error: the regular expression is invalid.
+        """
+        re.compile(pattern)
+        self._path_patterns.append(pattern)
+        self._path_regex = re.compile('|'.join(
+            '(?:{0})'.format(p) for p in self._path_patterns))
+
+    def get_node(self, path):
+        """Finds the trie node of a path.
+
+        Args:
+            path: the path to look up.
+
+        Returns:
+            `True` if the path is excluded by the trie, `None` if nothing
+            within the path is excluded by the trie, or a dict of the trie
+            node otherwise. The node can be passed to `get_child_node()`.
+        """
+        node = self.trie
+        for component in _split_path(path):
+            node = node.get(component)
+            if node is None or node is _EXCLUDED:
+                return node
+        return node
+
+    @staticmethod
+    def get_child_node(node, name):
+        """Finds the trie node of a child of a path.
+
+        Args:
+            node: the node of the parent path returned by `get_node()` or
+                this method.
+            name: the base name of the child.
+
+        Returns:
+            The same kind of value returned by `get_node()`.
+        """
+        if node is None or node is _EXCLUDED:
+            return node
+        return node.get(os.path.normcase(name))
+
+    def _get_relative_path(self, path):
+        """Returns the path relative to the current directory."""
+        path = os.path.abspath(path)
+        if path.startswith(self._cwd + os.sep):
+            path = path[len(self._cwd) + 1:]
+        else:
+            path = os.path.relpath(path, self._cwd)
+        return path.replace(os.sep, '/')
+
+    def matches_patterns(self, path, is_dir):
+        """Checks whether a path matches any of the patterns.
+
+        Args:
+            path: the path to check.
+            is_dir: whether the path is a directory.
+
+        Returns:
+            True if the path matches the patterns.
+        """
+        if not self.has_patterns:
+            return False
+        relative_path = self._get_relative_path(path)
+        if self._path_regex is not None and \
+           self._path_regex.search(relative_path):
+            return True
+        return is_dir and self._dir_regex is not None and \
+            self._dir_regex.match(relative_path) is not None
+
+    def is_excluded(self, path):
+        """Checks whether a file is excluded.
+
+        The file is excluded if itself or any of its parent directories is
+        excluded.
+
+        Args:
+            path: the path of the file to check.
+
+        Returns:
+            True if the file is excluded.
+        """
+        if self.get_node(path) is _EXCLUDED:
+            return True
+        if not self.has_patterns:
+            return False
+
+        if self.matches_patterns(path, False):
+            return True
+        dirname = os.path.dirname(os.path.abspath(path))
+        while True:
+            if self.matches_patterns(dirname, True):
+                return True
+            parent_dirname = os.path.dirname(dirname)
+            if parent_dirname == dirname:
+                return False
+            dirname = parent_dirname
+
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains functions to read lists of files to process.
+
+All lists are read incrementally, so linting can start before a long list is
+completely read and the list is never held in memory as a whole.
+"""
+
+import collections
+import json
+import os
+import re
+import sys
+
+import cpplint
+
+
+# The number of bytes read from a file list at once.
+_READ_SIZE = 65536
+# The pattern of the whitespace and commas between the elements of a JSON
+# array.
+_SEPARATOR_PATTERN = re.compile(r'[\s,]*')
+# The number of the most recently yielded paths of a compilation database
+# remembered to skip duplicate entries.
+_RECENT_PATH_COUNTS = 1024
+
+
+def read_response_file(filename):
+    """Reads a response file passed as '@filename'.
+
+    Args:
+        filename: the filename of the response file, which contains one path
+            per line. Empty lines are ignored.
+
+    Yields:
+        The paths in the response file.
+
+    Raises:
+        IOError: if the file cannot be read.
+    """
+    with open(filename, encoding='utf8') as response_file:
+        for line in response_file:
+            path = line.rstrip('\r\n')
+            if path:
+                yield path
+
+def read_null_delimited(filename):
+    """Reads a file of paths separated by null characters.
+
+    This is the format written by `find -print0` and `git ls-files -z`.
+
+    Args:
+        filename: the filename of the list, or '-' to read stdin.
+
+    Yields:
+        The paths in the list.
+
+    Raises:
+        IOError: if the file cannot be read.
+    """
+    if filename == '-':
+        list_file = sys.stdin.buffer
+    else:
+        list_file = open(filename, 'rb')
+    try:
+        remainder = b''
+        while True:
+            data = list_file.read(_READ_SIZE)
+            if not data:
+                break
+            paths = (remainder + data).split(b'\0')
+            remainder = paths.pop()
+            for path in paths:
+                if path:
+                    yield os.fsdecode(path)
+        # Also accepts a last path that is not terminated.
+        if remainder.strip(b'\r\n'):
+            yield os.fsdecode(remainder.strip(b'\r\n'))
+    finally:
+        if list_file is not sys.stdin.buffer:
+            list_file.close()
+
+def _iterate_json_array(filename):
+    """Decodes the elements of a JSON array in a file one by one.
+
+    Raises:
+        IOError: if the file cannot be read.
+        ValueError: if the file is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    with open(filename, encoding='utf8') as json_file:
+        buffer = json_file.read(_READ_SIZE).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError('{0} is not a JSON array'.format(filename))
+        position = 1
+        end_of_file = False
+        while True:
+            position = _SEPARATOR_PATTERN.match(buffer, position).end()
+            if buffer.startswith(']', position):
+                return
+            try:
+                element, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                # The element may be incomplete until more data is read.
+                if end_of_file:
+                    raise
+                data = json_file.read(_READ_SIZE)
+                end_of_file = not data
+                buffer = buffer[position:] + data
+                position = 0
+                continue
+            yield element
+
+def read_compile_commands(filename):
+    """Reads the translation units of a compilation database.
+
+    Args:
+        filename: the filename of a 'compile_commands.json' file.
+
+    Yields:
+        The path of each source file with one of cpplint's extensions. The
+        entries of a file compiled more than once are usually adjacent, so
+        a file is skipped if it is one of the most recently yielded files.
+        Only those are remembered, so the memory does not grow with the size
+        of the database. The paths within the current directory are relative
+        to it.
+
+    Raises:
+        IOError: if the file cannot be read.
+        ValueError: if the file is not a compilation database.
+    """
+    valid_extensions = cpplint.GetAllExtensions()
+    current_dir = os.path.join(os.getcwd(), '')
+    # The most recently yielded paths, with the least recent one first.
+    recent_paths = collections.OrderedDict()
+    for entry in _iterate_json_array(filename):
+        path = os.path.abspath(os.path.join(entry['directory'],
+                                            entry['file']))
+        if path in recent_paths:
+            recent_paths.move_to_end(path)
+            continue
+        if os.path.splitext(path)[1][1:] not in valid_extensions:
+            continue
+        recent_paths[path] = None
+        if len(recent_paths) > _RECENT_PATH_COUNTS:
+            recent_paths.popitem(last=False)
+        if path.startswith(current_dir):
+            path = path[len(current_dir):]
+        yield path
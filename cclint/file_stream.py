@@ -34,20 +34,24 @@ from __future__ import print_function
 import codecs
 import platform
 import sys
+import time
 
+from cclint import linter
 from cclint import utility
 
 
-# The line indent for each output message that passed to `FileStream.write()`.
+# The line indent for each file reported to `FileStream.report()`.
 _FILE_STREAM_INITIAL_LINE_INDENT = 6
-
-# The patterns to identify the warning messages from cpplint's output. Each
-# pattern contains a tuple of two strings, the first indicates that if a
-# cpplint's output starts with the defined string, the output is treated as
-# a warning message. The second is the separator that text behind which will
-# be printed in the next line of the filename.
-_WARNING_PATTERNS = (('Skipping input', ':'),
-                     ('Ignoring', ';'))
+# The names of the ANSI codes used by `FileStream`. Their values are looked up
+# once when a `FileStream` instance is initialized.
+_FILE_STREAM_ANSI_CODE_NAMES = ('FOREGROUND_CYAN', 'FOREGROUND_GREEN',
+                                'FOREGROUND_MAGENTA', 'FOREGROUND_RED',
+                                'FOREGROUND_RESET', 'FOREGROUND_WHITE',
+                                'FOREGROUND_YELLOW',
+                                'STYLE_DIM', 'STYLE_NORMAL',
+                                'STYLE_RESET_ALL')
+# The minimum interval in seconds between updates of the progress line.
+_PROGRESS_UPDATE_INTERVAL = 0.1
 
 
 class FileStream(codecs.StreamReaderWriter):
@@ -66,24 +70,57 @@ class FileStream(codecs.StreamReaderWriter):
             stream.begin(filename)
             cpplint.ProcessFile(filename, cpplint_state.verbose_level)
             stream.end()
+        stream.finish()
+
+    Alternatively, the results collected by `linter.lint_file()` can be
+    passed to `report()` directly without redirecting stderr. The formatted
+    output of each file is buffered and written to stdout at once.
     """
 
     def __init__(self, *args, **kwargs):
-        """Initialization."""
+        """Initialization.
+
+        Args:
+            progress: an optional keyword argument. If `True`, files without
+                errors and warnings are not printed, and a live count of the
+                processed files is shown on stderr when it is a terminal.
+            quiet: an optional keyword argument. If `True`, files without
+                errors and warnings are not printed.
+        """
+        self.progress = kwargs.pop('progress', False)
+        self.quiet = kwargs.pop('quiet', False) or self.progress
         codecs.StreamReaderWriter.__init__(self, *args, **kwargs)
         self.filename = ''
         self.error_counts = 0
         self.original_stderr = None
+        self._outputs = list()
         self.previous_file_has_error = False
         self.processed_files = 0
+        self.checked_files = 0
         self.total_error_counts = 0
+        self.guarded_files = list()
+        self.ansi_codes = dict((name, utility.get_ansi_code(name))
+                               for name in _FILE_STREAM_ANSI_CODE_NAMES)
+        # The formatting of error lines is precomputed as it is the hot path.
+        error_line_indent = _FILE_STREAM_INITIAL_LINE_INDENT + 2
+        self._error_line_prefix = (' ' * error_line_indent +
+                                   self.ansi_codes['FOREGROUND_YELLOW'] + '#')
+        self._error_line_separator = (self.ansi_codes['FOREGROUND_WHITE'] +
+                                      ': ' + self.ansi_codes['STYLE_DIM'])
+        self._error_line_suffix = self.ansi_codes['STYLE_RESET_ALL'] + '\n'
+        self._buffer = list()
+        self._progress_stream = sys.stderr
+        self._show_progress = self.progress and self._progress_stream.isatty()
+        self._progress_update_time = 0
         if platform.system() == 'Windows' or platform.system().lower().startswith('cygwin'):
             self.ok = '+'
             self.warning = '!'
+            self.skipped = '-'
             self.error = 'X'
         else:
             self.ok = '✓'
             self.warning = '⚠'
+            self.skipped = '⊘'
             self.error = '✗'
 
     def begin(self, filename):
@@ -98,7 +135,7 @@ class FileStream(codecs.StreamReaderWriter):
                 `cpplint.ProcessFile()`.
         """
         self.filename = filename
-        self.error_counts = 0
+        self._outputs = list()
         self.original_stderr = sys.stderr
         sys.stderr = self
 
@@ -107,8 +144,88 @@ class FileStream(codecs.StreamReaderWriter):
 
         This method should be called after each `cpplint.ProcessFile()` call.
         """
-        self.filename = ''
         sys.stderr = self.original_stderr
+        errors, warning = linter.parse_outputs(self.filename, self._outputs)
+        self._outputs = list()
+        self.report(self.filename, errors, warning)
+
+    def write(self, output):
+        """Collects an output message of cpplint until `end()` is called."""
+        self._outputs.append(output)
+
+    def report(self, filename, errors, warning):
+        """Formats the results of a file.
+
+        Args:
+            filename: the processed filename.
+            errors: a list of `linter.LintError` instances.
+            warning: the warning message of the file, or `None`. The files
+                skipped by a `linter.FileGuard` are printed with a distinct
+                state symbol and recorded in `guarded_files`.
+        """
+        ansi_codes = self.ansi_codes
+        line_indent = _FILE_STREAM_INITIAL_LINE_INDENT
+        self.filename = filename
+        self.error_counts = len(errors)
+        self.total_error_counts += self.error_counts
+
+        if linter.is_guard_warning(warning):
+            self.guarded_files.append(filename)
+            message = warning[len(linter.GUARD_WARNING_PREFIX):].strip()
+            self.print_filename(line_indent, self.skipped,
+                                ansi_codes['FOREGROUND_MAGENTA'],
+                                'skipped: ' + message)
+        elif warning is not None:
+            self.print_filename(line_indent, self.warning,
+                                ansi_codes['FOREGROUND_YELLOW'],
+                                warning[:1].lower() + warning[1:])
+        elif errors:
+            if self.processed_files > 0:
+                self._buffer.append('\n')
+            self.print_filename(line_indent, self.error,
+                                ansi_codes['FOREGROUND_RED'])
+            prefix = self._error_line_prefix
+            separator = self._error_line_separator
+            suffix = self._error_line_suffix
+            for error in errors:
+                if error.category:
+                    description = '{0}  [{1}] [{2:d}]'.format(
+                        error.message, error.category, error.confidence)
+                else:
+                    description = error.message
+                self._buffer.append(prefix + str(error.line) + separator +
+                                    description + suffix)
+        elif not self.quiet:
+            self.print_filename(line_indent, self.ok,
+                                ansi_codes['FOREGROUND_GREEN'])
+
+        self.flush_file()
+        self.filename = ''
+
+    def flush_file(self):
+        """Writes the buffered output of the current file to stdout."""
+        self.checked_files += 1
+        if self._buffer:
+            if self._show_progress:
+                self._progress_stream.write('\r\033[K')
+            sys.stdout.write(''.join(self._buffer))
+            sys.stdout.flush()
+            del self._buffer[:]
+        if self._show_progress:
+            current_time = time.time()
+            if current_time - self._progress_update_time >= \
+               _PROGRESS_UPDATE_INTERVAL:
+                self._progress_update_time = current_time
+                self._progress_stream.write(
+                    '\r{0:d} files checked, {1:d} errors found'.format(
+                        self.checked_files, self.total_error_counts))
+                self._progress_stream.flush()
+
+    def finish(self):
+        """Clears the progress line after all files are processed."""
+        if self._show_progress:
+            self._progress_stream.write('\r\033[K')
+            self._progress_stream.flush()
 
     def print_filename(self, line_indent, state_symbol, state_ansi_color_code,
                        message=None):
@@ -122,69 +239,23 @@ class FileStream(codecs.StreamReaderWriter):
             message: an optional string that will be printed on the next line
                 of the filename.
         """
+        ansi_codes = self.ansi_codes
         current_file_has_error = (state_symbol == self.error)
         if self.processed_files == 0 or \
            (self.previous_file_has_error and not current_file_has_error):
-            print('')
+            self._buffer.append('\n')
 
-        print(utility.get_ansi_code('FOREGROUND_RESET') + ' ' * line_indent +
-              state_ansi_color_code + state_symbol + ' ' +
-              utility.get_ansi_code('FOREGROUND_RESET') +
-              utility.get_ansi_code('STYLE_NORMAL') + self.filename)
+        self._buffer.append(ansi_codes['FOREGROUND_RESET'] +
+                            ' ' * line_indent +
+                            state_ansi_color_code + state_symbol + ' ' +
+                            ansi_codes['FOREGROUND_RESET'] +
+                            ansi_codes['STYLE_NORMAL'] + self.filename + '\n')
         if message:
-            print(' ' * line_indent +
-                  utility.get_ansi_code('FOREGROUND_CYAN') +
-                  utility.get_ansi_code('STYLE_DIM') +
-                  '  // {:}'.format(message) +
-                  utility.get_ansi_code('STYLE_RESET_ALL'))
+            self._buffer.append(' ' * line_indent +
+                                ansi_codes['FOREGROUND_CYAN'] +
+                                ansi_codes['STYLE_DIM'] +
+                                '  // {:}'.format(message) +
+                                ansi_codes['STYLE_RESET_ALL'] + '\n')
 
         self.processed_files += 1
         self.previous_file_has_error = current_file_has_error
-
-    def write(self, output):
-        """Formats the output message."""
-        # Restores the output stream temporarily so interpreter trackback
-        # can be displayed as usually.
-        sys.stderr = self.original_stderr
-        line_indent = _FILE_STREAM_INITIAL_LINE_INDENT
-
-        # Exits when done processing a file.
-        if output.startswith('Done'):
-            if self.error_counts == 0:
-                self.print_filename(line_indent, self.ok,
-                                    utility.get_ansi_code('FOREGROUND_GREEN'))
-            sys.stderr = self
-            return
-
-        # Exits when receiving a warning message.
-        for beginning_match, seprator in _WARNING_PATTERNS:
-            if output.startswith(beginning_match):
-                message = output.split(seprator, 1)[1].strip()
-                message = message[0].lower() + message[1:]
-                self.print_filename(line_indent, self.warning,
-                                    utility.get_ansi_code('FOREGROUND_YELLOW'),
-                                    message)
-                sys.stderr = self
-                return
-
-        # Found an error. Increments the `error_counts`.
-        self.error_counts += 1
-        self.total_error_counts += 1
-
-        if self.error_counts == 1:
-            if self.processed_files > 0:
-                print('')
-            self.print_filename(line_indent, self.error,
-                                utility.get_ansi_code('FOREGROUND_RED'))
-        line_number, description = output.split(':', 2)[1:]
-        line_indent += 2
-
-        print(' ' * line_indent +
-              utility.get_ansi_code('FOREGROUND_YELLOW') + '#' + line_number +
-              utility.get_ansi_code('FOREGROUND_WHITE') + ': ' +
-              utility.get_ansi_code('STYLE_DIM') + description.strip() +
-              utility.get_ansi_code('STYLE_RESET_ALL'))
-
-        # Reindirects the output stream to this instance so we can keep
-        # intercepting the messages from Google's cpplint.
-        sys.stderr = self
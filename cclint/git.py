@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains functions to query a local git repository."""
+
+import errno
+import os
+import subprocess
+
+
+# The modes of the regular files in git trees. Symbolic links and submodules
+# are not linted.
+_BLOB_MODES = (b'100644', b'100755')
+
+
+class GitError(Exception):
+    """Raised when a git command fails."""
+
+
+class Revision(object):
+    """The files of a git revision or of the index, read without checkout.
+
+    The contents of the files are streamed from one `git cat-file --batch`
+    process, so no process is started and no file is written for each file.
+    """
+
+    def __init__(self, rev=None):
+        """Initialization.
+
+        Args:
+            rev: the tree-ish of the revision, or `None` for the index, which
+                contains the staged changes.
+        """
+        self.rev = rev
+        self.object_ids = dict()
+
+    def list_files(self, paths):
+        """Lists the regular files of the revision within the paths.
+
+        Args:
+            paths: a list of file or directory paths limiting the listed
+                files.
+
+        Returns:
+            A sorted list of paths relative to the current directory.
+
+        Raises:
+            GitError: the git command fails.
+        """
+        if self.rev is None:
+            args = ['ls-files', '--stage', '-z', '--']
+        else:
+            args = ['ls-tree', '-r', '-z', self.rev, '--']
+        for entry in _run_git(args + list(paths)).split(b'\0'):
+            if not entry:
+                continue
+            info, path = entry.split(b'\t', 1)
+            fields = info.split()
+            if self.rev is None:
+                # Unmerged files only have the entries of other stages.
+                mode, object_id, stage = fields
+                if stage != b'0':
+                    continue
+            else:
+                mode, _, object_id = fields
+            if mode not in _BLOB_MODES:
+                continue
+            filename = os.path.normpath(path.decode('utf8', 'surrogateescape'))
+            self.object_ids[filename] = object_id.decode('ascii')
+        return sorted(self.object_ids)
+
+    def read_files(self, filenames):
+        """Reads the contents of files in the revision.
+
+        Args:
+            filenames: an iterable of filenames listed by `list_files()`. It
+                is consumed lazily.
+
+        Yields:
+            A tuple of the filename and the bytes of the file, or an
+            `EnvironmentError` instance if the file is not in the revision,
+            like `linter.read_content()`.
+
+        Raises:
+            GitError: the git command cannot be executed or exits.
+        """
+        try:
+            process = subprocess.Popen(['git', 'cat-file', '--batch'],
+                                       stdin=subprocess.PIPE,
+                                       stdout=subprocess.PIPE)
+        except OSError as error:
+            raise GitError('Cannot execute git: {0}'.format(error)) from error
+
+        try:
+            for filename in filenames:
+                object_id = self.object_ids.get(filename)
+                if object_id is None:
+                    yield filename, IOError(errno.ENOENT, 'Not in revision',
+                                            filename)
+                    continue
+                process.stdin.write(object_id.encode('ascii') + b'\n')
+                process.stdin.flush()
+                # The header is "<object> <type> <size>", or
+                # "<object> missing" if the object does not exist.
+                header = process.stdout.readline().split()
+                if not header:
+                    raise GitError('git cat-file exited unexpectedly')
+                if len(header) != 3:
+                    yield filename, IOError(errno.ENOENT, 'Missing object',
+                                            filename)
+                    continue
+                content = process.stdout.read(int(header[2]))
+                process.stdout.read(1)
+                yield filename, content
+        finally:
+            process.stdin.close()
+            process.stdout.close()
+            process.wait()
+
+
+def _run_git(args):
+    """Runs a git command and returns its output.
+
+    Args:
+        args: a list of arguments passed to the git command.
+
+    Returns:
+        The output bytes of the git command.
+
+    Raises:
+        GitError: the git command cannot be executed or fails.
+    """
+    try:
+        process = subprocess.Popen(['git'] + args,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+    except OSError as error:
+        raise GitError('Cannot execute git: {0}'.format(error)) from error
+
+    output, error_output = process.communicate()
+    if process.returncode != 0:
+        raise GitError(error_output.decode('utf8', 'replace').strip())
+    return output
+
+def _split_null_terminated(output):
+    """Splits the NUL-terminated output of a git command into paths."""
+    return [os.path.normpath(path.decode('utf8', 'surrogateescape'))
+            for path in output.split(b'\0') if path]
+
+def get_changed_files(ref):
+    """Lists the files changed since a git revision.
+
+    The list consists of the files that are added, copied, modified or
+    renamed between `ref` and the working tree, plus the untracked files
+    that are not ignored by git. Deleted files are not included. All paths
+    are relative to the current directory and limited to it.
+
+    Args:
+        ref: the git revision to compare with.
+
+    Returns:
+        A sorted list of paths.
+
+    Raises:
+        GitError: the git command fails.
+    """
+    changed_files = _split_null_terminated(_run_git(
+        ['diff', '--name-only', '--relative', '--diff-filter=d', '-z', ref,
+         '--']))
+    untracked_files = _split_null_terminated(_run_git(
+        ['ls-files', '--others', '--exclude-standard', '-z']))
+    return sorted(set(changed_files) | set(untracked_files))
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains the rules of ignore files such as `.gitignore`.
+
+The rules are loaded per directory while walking directories, so ignored
+directories can be pruned before anything inside them is listed.
+"""
+
+import os
+import re
+
+from cclint import exclusion
+
+
+# The names of the ignore files loaded in each directory. The rules of a
+# later file take precedence over the rules of an earlier file.
+_IGNORE_FILENAMES = ('.gitignore', '.cclintignore')
+# The path of git's repository-specific ignore file relative to the
+# repository's top-level directory.
+_GIT_EXCLUDE_PATH = os.path.join('.git', 'info', 'exclude')
+
+
+class IgnoreRules(object):
+    """The rules of the ignore files in a directory.
+
+    The patterns have the semantics of `.gitignore` files. A pattern
+    containing a slash except at the end is matched against the path relative
+    to the directory, otherwise it is matched against the name at any depth.
+    A trailing slash only matches directories, and a leading '!' includes the
+    matched paths again. The last matching pattern decides whether a path is
+    ignored. Consecutive patterns of the same kind are compiled into a single
+    regular expression, so matching a path takes a few regular expression
+    searches regardless of the number of patterns.
+    """
+
+    def __init__(self, dirname, lines):
+        """Initialization.
+
+        Args:
+            dirname: the directory of the ignore files.
+            lines: an iterable of the lines of the ignore files, in the
+                order of precedence from low to high.
+        """
+        self.prefix = os.path.join(os.path.abspath(dirname), '')
+        # A list of tuples of whether the patterns are negated, whether they
+        # only match directories, and the list of their regular expressions.
+        groups = list()
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if not line.endswith('\\ '):
+                line = line.rstrip(' ')
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            if '/' in line:
+                regex = exclusion.translate_glob(line.lstrip('/'))
+            else:
+                regex = '(?:.*/)?' + exclusion.translate_glob(line)
+            if groups and groups[-1][:2] == (negated, dir_only):
+                groups[-1][2].append(regex)
+            else:
+                groups.append((negated, dir_only, [regex]))
+        # Compiled in reverse order so the last matching pattern wins.
+        self._groups = [(negated, dir_only, re.compile('|'.join(
+            '(?:{0})'.format(regex) for regex in regexes)))
+                        for negated, dir_only, regexes in reversed(groups)]
+
+    def __bool__(self):
+        return bool(self._groups)
+
+    def match(self, path, is_dir):
+        """Checks whether a path is ignored by the rules.
+
+        Args:
+            path: the absolute path within the directory of the rules.
+            is_dir: whether the path is a directory.
+
+        Returns:
+            True if the path is ignored, False if it is included again by a
+            negated pattern, or `None` if no pattern matches.
+        """
+        relative_path = path[len(self.prefix):]
+        if os.sep != '/':
+            relative_path = relative_path.replace(os.sep, '/')
+        for negated, dir_only, regex in self._groups:
+            if (is_dir or not dir_only) and regex.match(relative_path):
+                return not negated
+        return None
+
+
+def load_rules(dirname, names=None):
+    """Loads the rules of the ignore files in a directory.
+
+    If the directory is the top-level directory of a git repository, its
+    `.git/info/exclude` file is loaded as well with the lowest precedence.
+
+    Args:
+        dirname: the directory to load the ignore files.
+        names: the optional set of the names in the directory if they are
+            already listed, which avoids checking whether each ignore file
+            exists.
+
+    Returns:
+        An `IgnoreRules` instance, or `None` if no rules are found.
+    """
+    paths = list()
+    if names is None or '.git' in names:
+        if os.path.isdir(os.path.join(dirname, '.git')):
+            paths.append(os.path.join(dirname, _GIT_EXCLUDE_PATH))
+    paths.extend(os.path.join(dirname, name) for name in _IGNORE_FILENAMES
+                 if names is None or name in names)
+
+    lines = list()
+    for path in paths:
+        try:
+            with open(path, encoding='utf8', errors='replace') as ignore_file:
+                lines.extend(ignore_file)
+        except (IOError, OSError):
+            continue
+    rules = IgnoreRules(dirname, lines)
+    return rules if rules else None
+
+def load_parent_rules(dirname):
+    """Loads the rules of the ignore files in the parent directories.
+
+    The parent directories are searched up to the top-level directory of the
+    git repository containing the directory. Nothing is loaded if the
+    directory is not within a git repository.
+
+    Args:
+        dirname: the directory whose parent directories are searched.
+
+    Returns:
+        A list of `IgnoreRules` instances ordered from the top-level
+        directory.
+    """
+    parent_dirnames = list()
+    dirname = os.path.abspath(dirname)
+    while not os.path.isdir(os.path.join(dirname, '.git')):
+        parent_dirname = os.path.dirname(dirname)
+        if parent_dirname == dirname:
+            return list()
+        dirname = parent_dirname
+        parent_dirnames.append(dirname)
+    rules = [load_rules(parent_dirname)
+             for parent_dirname in reversed(parent_dirnames)]
+    return [item for item in rules if item is not None]
+
+def is_ignored(rules, path, is_dir):
+    """Checks whether a path is ignored by the rules of its directories.
+
+    Args:
+        rules: a sequence of `IgnoreRules` instances of the directories
+            containing the path, ordered from the outermost directory.
+        path: the absolute path to check.
+        is_dir: whether the path is a directory.
+
+    Returns:
+        True if the path is ignored.
+    """
+    for item in reversed(rules):
+        result = item.match(path, is_dir)
+        if result is not None:
+            return result
+    return False
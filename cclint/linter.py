@@ -0,0 +1,881 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains functions to run cpplint and collect its errors."""
+
+import collections
+import contextlib
+import copy
+import functools
+import itertools
+import os
+import re
+import signal
+import sys
+import threading
+import time
+
+import cpplint
+
+from cclint import config
+from cclint import repository_cache
+
+
+# The names of cpplint's module-level variables that affect the lint results.
+# They are copied to the worker processes and restored after linting each file
+# because `cpplint.ProcessConfigOverrides()` changes some of them permanently.
+_CPPLINT_GLOBAL_NAMES = ('_config_filename', '_excludes', '_hpp_headers',
+                         '_include_order', '_line_length', '_repository',
+                         '_root', '_valid_extensions')
+# The names of the attributes of `cpplint._cpplint_state` that affect the lint
+# results.
+_CPPLINT_STATE_NAMES = ('counting', 'filters', 'output_format', 'quiet',
+                        'verbose_level')
+# The number of files sent to a worker process at once.
+_CHUNK_SIZE = 8
+# The maximum number of chunks sent to each worker process ahead of their
+# results being reported, which bounds the memory used by the pending files
+# and results regardless of the number of files.
+_PENDING_CHUNKS_PER_JOB = 4
+# The number of threads reading files ahead of linting them.
+_PREFETCH_THREADS = 4
+# The maximum number of files read ahead of linting them, which bounds the
+# memory used by the read contents.
+_PREFETCH_DEPTH = 16
+# The lock serializing the use of cpplint, whose settings and NOLINT
+# suppressions are module-level variables, so files can be linted from
+# multiple threads.
+_CPPLINT_LOCK = threading.RLock()
+# The cache of the CPPLINT.cfg files applied to the processed files.
+_CONFIG_CACHE = config.ConfigCache()
+# The cache of the repository names found by cpplint, shared by all files
+# linted in the process. It is only used while `_CPPLINT_LOCK` is held.
+_REPOSITORY_CACHE = repository_cache.RepositoryNameCache()
+# The number of times the caches are refreshed by `refresh_caches()`. It is
+# sent along with the files to lint so the worker processes of a reused pool
+# refresh their caches as well.
+_cache_generation = 0
+# The generation of the caches of the parent process when the caches of this
+# worker process were last refreshed.
+_parent_cache_generation = None
+# The names of the options accepted by `lint_sources()`.
+_OPTION_NAMES = ('config', 'extensions', 'filter', 'headers', 'includeorder',
+                 'linelength', 'repository', 'root', 'verbose')
+
+# The patterns to identify the warning messages from cpplint's output. Each
+# pattern contains a tuple of two strings, the first indicates that if a
+# cpplint's output starts with the defined string, the output is treated as
+# a warning message. The second is the separator that text behind which is
+# the warning message.
+WARNING_PATTERNS = (('Skipping input', ':'),
+                    ('Ignoring', ';'))
+# The beginning of the warning messages of the files skipped by a
+# `FileGuard`, which distinguishes them from cpplint's warnings.
+GUARD_WARNING_PREFIX = 'Skipped by guard:'
+# The pattern of an error message in cpplint's default output format after
+# the filename and the colon.
+_ERROR_PATTERN = re.compile(r'(\d+):\s*(.*?)\s+\[([^\]]+)\]\s+\[(\d+)\]\s*\Z',
+                            re.DOTALL)
+
+
+class LintError(object):
+    """An error reported by cpplint."""
+
+    __slots__ = ('filename', 'line', 'category', 'confidence', 'message')
+
+    def __init__(self, filename, line, category, confidence, message):
+        """Initialization.
+
+        Args:
+            filename: the filename of the error.
+            line: the line number of the error, or 0 for the whole file.
+            category: the category string of the error such as
+                'whitespace/tab'.
+            confidence: the confidence integer of the error from 1 to 5.
+            message: the error message.
+        """
+        self.filename = filename
+        self.line = line
+        self.category = category
+        self.confidence = confidence
+        self.message = message
+
+    def __eq__(self, other):
+        return isinstance(other, LintError) and \
+            all(getattr(self, name) == getattr(other, name)
+                for name in self.__slots__)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'LintError({0})'.format(', '.join(
+            repr(getattr(self, name)) for name in self.__slots__))
+
+
+class FileGuard(object):
+    """The limits protecting a run from pathological files.
+
+    Files larger than `max_size` bytes are not linted, and linting a file is
+    interrupted after `timeout` seconds. The timeout is implemented with
+    `SIGALRM`, so it only applies when files are linted in the main thread of
+    a process on platforms supporting `signal.setitimer()`.
+    """
+
+    __slots__ = ('timeout', 'max_size')
+
+    def __init__(self, timeout=None, max_size=None):
+        """Initialization.
+
+        Args:
+            timeout: the maximum number of seconds to lint a file, or `None`
+                for no limit.
+            max_size: the maximum size of a file in bytes, or `None` for no
+                limit.
+        """
+        self.timeout = timeout
+        self.max_size = max_size
+
+    def check_size(self, filename, content=None):
+        """Checks whether a file is within the size limit.
+
+        Args:
+            filename: the filename to check. stdin, '-', is never checked.
+            content: the optional value returned by `read_content()` for the
+                file if it is already read.
+
+        Returns:
+            The warning message of the file if it is too large, otherwise
+            `None`.
+        """
+        if self.max_size is None or filename == '-':
+            return None
+        if isinstance(content, bytes):
+            size = len(content)
+        else:
+            try:
+                size = os.stat(filename).st_size
+            except EnvironmentError:
+                # The error is reported when the file is read.
+                return None
+        if size <= self.max_size:
+            return None
+        return '{0} larger than {1:d} bytes'.format(GUARD_WARNING_PREFIX,
+                                                    self.max_size)
+
+    @contextlib.contextmanager
+    def limit_time(self):
+        """Interrupts the code in the context after the timeout.
+
+        Raises:
+            FileTimeoutError: if the timeout is exceeded.
+        """
+        if self.timeout is None or \
+           threading.current_thread() is not threading.main_thread():
+            yield
+            return
+        import signal
+        if not hasattr(signal, 'setitimer'):
+            yield
+            return
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, self.timeout)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+    def get_timeout_warning(self):
+        """Returns the warning message of a file exceeding the timeout."""
+        return '{0} timed out after {1:g} seconds'.format(GUARD_WARNING_PREFIX,
+                                                          self.timeout)
+
+
+class FileTimeoutError(Exception):
+    """Raised when linting a file exceeds the timeout of a `FileGuard`."""
+
+
+class ErrorCollector(object):
+    """The collector of the errors and the warning of a file.
+
+    Its `error()` method is passed to `cpplint.ProcessFileData()` as the error
+    function, so errors are recorded directly without formatting and parsing
+    cpplint's text output. Each instance should only be used for one file.
+    """
+
+    __slots__ = ('errors', 'warning')
+
+    def __init__(self):
+        """Initialization."""
+        self.errors = list()
+        self.warning = None
+
+    def error(self, filename, linenum, category, confidence, message):
+        """Records an error if cpplint would print it.
+
+        Args:
+            filename: the filename of the error.
+            linenum: the line number of the error.
+            category: the category string of the error.
+            confidence: the confidence integer of the error.
+            message: the error message.
+        """
+        # pylint: disable=protected-access
+        if cpplint._ShouldPrintError(category, confidence, filename, linenum):
+            self.errors.append(LintError(filename, linenum, category,
+                                         confidence, message))
+
+def _raise_timeout(signum, frame):
+    """Handles `SIGALRM` set by `FileGuard.limit_time()`."""
+    raise FileTimeoutError()
+
+def is_guard_warning(warning):
+    """Checks whether a warning message is emitted by a `FileGuard`.
+
+    Args:
+        warning: the warning message of a file, or `None`.
+
+    Returns:
+        True if the file is skipped by a `FileGuard`.
+    """
+    return warning is not None and warning.startswith(GUARD_WARNING_PREFIX)
+
+def parse_warning(output):
+    """Extracts the warning message from a cpplint's output string.
+
+    Args:
+        output: an output string emitted by cpplint.
+
+    Returns:
+        The warning message, or `None` if the output is not a warning.
+    """
+    for beginning_match, separator in WARNING_PATTERNS:
+        if output.startswith(beginning_match):
+            message = output[len(beginning_match):]
+            if separator in message:
+                message = message.split(separator, 1)[1]
+            return message.strip()
+    return None
+
+def parse_outputs(filename, outputs):
+    """Converts cpplint's output strings of a file into structured records.
+
+    Args:
+        filename: the filename string passed to `cpplint.ProcessFile()`.
+        outputs: a list of output strings emitted by cpplint.
+
+    Returns:
+        A tuple of a list of `LintError` instances and the warning message of
+        the file, which is `None` if no warning is emitted.
+    """
+    errors = list()
+    warning = None
+    prefix = filename + ':'
+    for output in outputs:
+        if output.startswith('Done'):
+            continue
+        message = parse_warning(output)
+        if message is not None:
+            warning = message
+            continue
+
+        match = None
+        if output.startswith(prefix):
+            match = _ERROR_PATTERN.match(output, len(prefix))
+        if match is None:
+            errors.append(LintError(filename, 0, '', 0, output.strip()))
+        else:
+            line, message, category, confidence = match.groups()
+            errors.append(LintError(filename, int(line), category,
+                                    int(confidence), message))
+    return errors, warning
+
+def get_cpplint_state():
+    """Takes a snapshot of cpplint's settings.
+
+    Returns:
+        A dict of cpplint's settings that can be passed to
+        `set_cpplint_state()`.
+    """
+    # pylint: disable=protected-access
+    state = dict()
+    for name in _CPPLINT_GLOBAL_NAMES:
+        if hasattr(cpplint, name):
+            state[name] = copy.copy(getattr(cpplint, name))
+    for name in _CPPLINT_STATE_NAMES:
+        state['state.' + name] = copy.copy(getattr(cpplint._cpplint_state,
+                                                   name))
+    return state
+
+def set_cpplint_state(state):
+    """Restores cpplint's settings from a snapshot.
+
+    Args:
+        state: a dict returned by `get_cpplint_state()`.
+    """
+    # pylint: disable=protected-access
+    for name, value in state.items():
+        if name.startswith('state.'):
+            setattr(cpplint._cpplint_state, name[6:], copy.copy(value))
+        else:
+            setattr(cpplint, name, copy.copy(value))
+
+def process_text(filename, text, collector, pruner=None):
+    """Runs cpplint on the content of a file.
+
+    This function does what `cpplint.ProcessFile()` does after the file is
+    read, except that the errors are reported to `collector`.
+
+    Args:
+        filename: the filename of the content.
+        text: the content string of the file.
+        collector: an `ErrorCollector` instance to record the results.
+        pruner: an optional `pruning.CheckPruner` instance to skip the checks
+            whose errors are all filtered out.
+    """
+    lf_lines = list()
+    crlf_lines = list()
+    lines = text.split('\n')
+    # Removes trailing '\r'. The last line is the empty string after the
+    # trailing newline, or the incomplete last line.
+    for linenum in range(len(lines) - 1):
+        if lines[linenum].endswith('\r'):
+            lines[linenum] = lines[linenum].rstrip('\r')
+            crlf_lines.append(linenum + 1)
+        else:
+            lf_lines.append(linenum + 1)
+
+    # Note, if no dot is found, this will give the entire filename as the ext.
+    file_extension = filename[filename.rfind('.') + 1:]
+    all_extensions = cpplint.GetAllExtensions()
+    if filename != '-' and file_extension not in all_extensions:
+        collector.warning = 'not a valid file name ({0})'.format(
+            ', '.join(all_extensions))
+        return
+
+    # This function is always called with `_CPPLINT_LOCK` held.
+    with _REPOSITORY_CACHE.install():
+        if pruner is None:
+            cpplint.ProcessFileData(filename, file_extension, lines,
+                                    collector.error)
+        else:
+            with pruner.prune(filename):
+                cpplint.ProcessFileData(filename, file_extension, lines,
+                                        collector.error)
+    # Warns on every line with CR if end-of-line sequences are mixed.
+    if lf_lines and crlf_lines:
+        for linenum in crlf_lines:
+            collector.error(filename, linenum, 'whitespace/newline', 1,
+                            'Unexpected \\r (^M) found; better to use only '
+                            '\\n')
+
+def process_config(filename, collector):
+    """Applies the CPPLINT.cfg files of a file to cpplint's settings.
+
+    Args:
+        filename: the filename whose parent directories are searched for
+            CPPLINT.cfg files.
+        collector: an `ErrorCollector` instance to record the warning if the
+            file is excluded, unless cpplint's 'quiet' flag is set, in which
+            case excluded files are skipped silently like cpplint does.
+
+    Returns:
+        False if the file is excluded by a CPPLINT.cfg file, otherwise True.
+    """
+    # pylint: disable=protected-access
+    should_process = _CONFIG_CACHE.apply(filename)
+    if not should_process and not cpplint._cpplint_state.quiet:
+        collector.warning = 'file excluded by {0}'.format(
+            cpplint._config_filename)
+    return should_process
+
+def refresh_caches():
+    """Checks whether the cached files are changed on next use.
+
+    The CPPLINT.cfg files are parsed once and then only checked after this
+    function is called, which is done by `lint_files()` and `lint_sources()`
+    for each run. The cached repository names are forgotten as well.
+    """
+    global _cache_generation  # pylint: disable=global-statement
+    _cache_generation += 1
+    _CONFIG_CACHE.refresh()
+    with _CPPLINT_LOCK:
+        _REPOSITORY_CACHE.refresh()
+
+def read_content(filename):
+    """Reads the bytes of a file.
+
+    Args:
+        filename: the filename to read.
+
+    Returns:
+        The bytes of the file, or the `EnvironmentError` instance raised
+        while reading the file.
+    """
+    try:
+        with open(filename, 'rb') as target_file:
+            return target_file.read()
+    except EnvironmentError as error:
+        return error
+
+def read_text(filename, content=None):
+    """Reads and decodes a file the same way as `cpplint.ProcessFile()`.
+
+    Args:
+        filename: the filename to read, or '-' to read stdin.
+        content: the optional value returned by `read_content()` for the
+            file. If it is `None`, the file is read by this function.
+
+    Returns:
+        The content string of the file.
+
+    Raises:
+        EnvironmentError: if the file cannot be read.
+    """
+    if content is None:
+        if filename == '-':
+            return sys.stdin.read()
+        content = read_content(filename)
+    if isinstance(content, EnvironmentError):
+        raise content
+    return content.decode('utf8', 'replace')
+
+def prefetch_files(filenames):
+    """Reads files ahead with a pool of threads.
+
+    Up to `_PREFETCH_DEPTH` files are read while the previous files are
+    being linted, so linting does not wait for reading files from slow file
+    systems. stdin is not read ahead.
+
+    Args:
+        filenames: an iterable of filenames. It is consumed lazily.
+
+    Yields:
+        A tuple of the filename and the value returned by `read_content()`,
+        which is `None` for '-'.
+    """
+    import concurrent.futures
+    executor = concurrent.futures.ThreadPoolExecutor(_PREFETCH_THREADS)
+    pending = collections.deque()
+    try:
+        for filename in filenames:
+            if filename == '-':
+                pending.append((filename, None))
+            else:
+                pending.append((filename,
+                                executor.submit(read_content, filename)))
+            if len(pending) >= _PREFETCH_DEPTH:
+                filename, future = pending.popleft()
+                yield filename, future and future.result()
+        while pending:
+            filename, future = pending.popleft()
+            yield filename, future and future.result()
+    finally:
+        executor.shutdown(wait=False)
+
+def process_file(filename, vlevel, collector, content=None, guard=None,
+                 pruner=None):
+    """Runs cpplint on a file.
+
+    This function does what `cpplint.ProcessFile()` does, except that the
+    errors and the warning are reported to `collector` instead of being
+    printed.
+
+    Args:
+        filename: the filename to process, or '-' to read stdin.
+        vlevel: the verbose level of the errors to report.
+        collector: an `ErrorCollector` instance to record the results.
+        content: the optional value returned by `read_content()` for the
+            file if it is already read.
+        guard: an optional `FileGuard` instance. Files exceeding its size
+            limit are reported with a warning without being linted.
+        pruner: an optional `pruning.CheckPruner` instance.
+    """
+    cpplint._SetVerboseLevel(vlevel)  # pylint: disable=protected-access
+    if not process_config(filename, collector):
+        return
+
+    if guard is not None:
+        warning = guard.check_size(filename, content)
+        if warning is not None:
+            collector.warning = warning
+            return
+
+    try:
+        text = read_text(filename, content)
+    except EnvironmentError:
+        collector.warning = "Can't open for reading"
+        return
+
+    process_text(filename, text, collector, pruner)
+
+def lint_file(filename, vlevel, cache=None, content=None, guard=None,
+              pruner=None):
+    """Runs cpplint on a file and collects its errors.
+
+    cpplint's settings are restored after the file is processed so the
+    results do not depend on the previously processed files.
+
+    Args:
+        filename: the filename to process, or '-' to read stdin.
+        vlevel: the verbose level of the errors to report.
+        cache: an optional `cache.ResultCache` instance. If the results of
+            the file are cached, they are returned without calling cpplint.
+        content: the optional value returned by `read_content()` for the
+            file if it is already read.
+        guard: an optional `FileGuard` instance. If the file exceeds its
+            limits, the errors are discarded and the warning message of the
+            guard is returned. Such results are not cached.
+        pruner: an optional `pruning.CheckPruner` instance to skip the checks
+            whose errors are all filtered out.
+
+    Returns:
+        A tuple of a list of `LintError` instances and the warning message of
+        the file, which is `None` if no warning is emitted.
+    """
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.get_key(filename, content)
+        if cache_key is not None:
+            result = cache.get(cache_key, filename)
+            if result is not None:
+                return result
+
+    collector = ErrorCollector()
+    with _CPPLINT_LOCK:
+        state = get_cpplint_state()
+        try:
+            if guard is None:
+                process_file(filename, vlevel, collector, content,
+                             pruner=pruner)
+            else:
+                with guard.limit_time():
+                    process_file(filename, vlevel, collector, content, guard,
+                                 pruner)
+        except FileTimeoutError:
+            collector = ErrorCollector()
+            collector.warning = guard.get_timeout_warning()
+        finally:
+            set_cpplint_state(state)
+
+    if is_guard_warning(collector.warning):
+        return collector.errors, collector.warning
+    if cache_key is not None:
+        cache.set(cache_key, collector.errors, collector.warning)
+    return collector.errors, collector.warning
+
+def _apply_options(options):
+    """Applies the options of `lint_sources()` to cpplint's settings."""
+    # pylint: disable=protected-access
+    for name, value in options.items():
+        if name in ('extensions', 'filter', 'headers') and \
+           not isinstance(value, str):
+            value = ','.join(value)
+        if name == 'extensions':
+            cpplint.ProcessExtensionsOption(value)
+        elif name == 'filter':
+            cpplint._SetFilters(value)
+        elif name == 'headers':
+            cpplint.ProcessHppHeadersOption(value)
+        elif name == 'includeorder':
+            # cpplint exits on invalid values.
+            if value not in ('default', 'standardcfirst'):
+                raise ValueError('Invalid includeorder: {0}'.format(value))
+            cpplint.ProcessIncludeOrderOption(value)
+        elif name == 'linelength':
+            cpplint._line_length = int(value)
+        elif name == 'repository':
+            cpplint._repository = value
+        elif name == 'root':
+            cpplint._root = value
+        elif name == 'verbose':
+            cpplint._SetVerboseLevel(int(value))
+
+def _lint_sources(sources, options):
+    """Yields the results of `lint_sources()`."""
+    for filename, text in sources:
+        collector = ErrorCollector()
+        with _CPPLINT_LOCK:
+            state = get_cpplint_state()
+            try:
+                _apply_options(options)
+                if not options.get('config') or \
+                   process_config(filename, collector):
+                    process_text(filename, text, collector)
+            finally:
+                set_cpplint_state(state)
+        yield filename, collector.errors, collector.warning
+
+def lint_sources(sources, options=None):
+    """Runs cpplint on the contents of files without reading them.
+
+    This function is the library interface of cclint. It does not print
+    anything, replace `sys.stderr` or exit. cpplint's settings of the calling
+    process are used unless they are overridden by `options`, and they are
+    left unchanged.
+
+    It is safe to call from multiple threads, but not concurrent: cpplint
+    keeps its state in module-level variables, so each source is linted
+    while holding a lock shared by the whole process, and the threads lint
+    one source at a time. Use `lint_files()` with `jobs` greater than 1 to
+    lint files in parallel.
+
+    Args:
+        sources: an iterable of tuples of a filename and the content string
+            of the file. It is consumed lazily. The filename is used for the
+            checks depending on the path such as header guards.
+        options: an optional dict of cpplint's settings. The keys are the
+            names of cpplint's flags 'extensions', 'filter', 'headers',
+            'includeorder', 'linelength', 'repository', 'root' and
+            'verbose', with the same values as the flags. The values of
+            'extensions', 'filter' and 'headers' can also be lists. If the
+            'config' key is True, the CPPLINT.cfg files in the parent
+            directories of each filename are applied, which are read from
+            the file system.
+
+    Returns:
+        An iterator yielding a tuple of the filename, a list of `LintError`
+        instances and the warning message, which is `None` if no warning is
+        emitted, for each source in order.
+
+    Raises:
+        ValueError: if an option is unknown or invalid.
+    """
+    refresh_caches()
+    options = dict(options or {})
+    for name in options:
+        if name not in _OPTION_NAMES:
+            raise ValueError('Unknown option: {0}'.format(name))
+    # Validates the values before any source is linted.
+    with _CPPLINT_LOCK:
+        state = get_cpplint_state()
+        try:
+            _apply_options(options)
+        finally:
+            set_cpplint_state(state)
+    return _lint_sources(sources, options)
+
+def _lint_file_with_name(filename, vlevel, cache, timed=False,
+                         content=None, guard=None, pruner=None,
+                         baseline_root=None):
+    """Calls `lint_file()` and returns the filename with its results.
+
+    The fourth item of the returned tuple is the timing of the file described
+    in `lint_files()` if `timed` is True, and the last item is the list of the
+    fingerprints of the errors returned by `baseline.get_fingerprints()` with
+    `baseline_root` if it is not `None`. Otherwise they are `None`.
+    """
+    fingerprinted = baseline_root is not None
+    start_time = time.time()
+    start_cpu_time = time.process_time()
+    # The lines of the errors are needed for their fingerprints.
+    if fingerprinted and content is None and filename != '-':
+        content = read_content(filename)
+    errors, warning = lint_file(filename, vlevel, cache, content, guard,
+                                pruner)
+    timing = None
+    if timed:
+        timing = (os.getpid(), start_time, time.time() - start_time,
+                  time.process_time() - start_cpu_time)
+    fingerprints = None
+    if fingerprinted:
+        from cclint import baseline
+        fingerprints = baseline.get_fingerprints(filename, errors, content,
+                                                 baseline_root)
+    return filename, errors, warning, timing, fingerprints
+
+def _lint_source_with_name(source, vlevel, cache, timed=False, guard=None,
+                           pruner=None, baseline_root=None):
+    """Calls `_lint_file_with_name()` with a filename and content tuple."""
+    filename, content = source
+    return _lint_file_with_name(filename, vlevel, cache, timed, content,
+                                guard, pruner, baseline_root)
+
+def _lint_chunk(function, tasks, generation):
+    """Calls `function` with each task of a chunk and returns the results.
+
+    The caches of the worker process are refreshed first if the caches of the
+    parent process, whose generation is `generation`, are refreshed since
+    the last chunk.
+    """
+    global _parent_cache_generation  # pylint: disable=global-statement
+    if generation != _parent_cache_generation:
+        refresh_caches()
+        _parent_cache_generation = generation
+    return [function(task) for task in tasks]
+
+def _initialize_worker(state):
+    """Initializes a worker process of a pool created by `create_pool()`.
+
+    Ctrl-C is left to the parent process, which terminates the pool.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    set_cpplint_state(state)
+
+def create_pool(jobs):
+    """Returns a pool of worker processes to pass to `lint_files()`.
+
+    The worker processes use the cpplint settings of the current process, so
+    the pool should be created after the settings are set.
+
+    Args:
+        jobs: the number of worker processes.
+    """
+    import multiprocessing
+    return multiprocessing.Pool(jobs, _initialize_worker,
+                                (get_cpplint_state(),))
+
+def _iterate_pool_results(pool, function, tasks, max_pending):
+    """Runs a function on tasks with a pool and yields the results in order.
+
+    Unlike `multiprocessing.Pool.imap()`, which consumes the tasks in a
+    background thread as fast as it can, at most `max_pending` chunks of
+    `_CHUNK_SIZE` tasks are sent ahead of the yielded results, so the memory
+    stays flat however many tasks there are and however slowly the results
+    are consumed.
+
+    Args:
+        pool: a `multiprocessing.Pool` instance.
+        function: a picklable callable called with each task.
+        tasks: an iterable of tasks. It is consumed lazily.
+        max_pending: the maximum number of chunks sent ahead.
+
+    Yields:
+        The value returned by `function` for each task.
+    """
+    pending = collections.deque()
+    tasks = iter(tasks)
+    while True:
+        chunk = list(itertools.islice(tasks, _CHUNK_SIZE))
+        if chunk:
+            pending.append(pool.apply_async(
+                _lint_chunk, (function, chunk, _cache_generation)))
+        if pending and (not chunk or len(pending) >= max_pending):
+            for result in pending.popleft().get():
+                yield result
+        elif not chunk:
+            return
+
+def lint_files(filenames, vlevel, jobs=1, cache=None, timings=None,
+               guard=None, pruner=None, reader=None, baseline_index=None,
+               pool=None):
+    """Runs cpplint on files and yields the results of each file.
+
+    When `jobs` is greater than 1, the files are processed by a pool of worker
+    processes, each reading its own files. Otherwise the files are read ahead
+    by `prefetch_files()` while linting. Starting worker processes costs more
+    than linting a few files, so the files are linted in the current process
+    if there are fewer than two chunks of them, and no more processes are
+    started than there are chunks. The results are always yielded in
+    the order of `filenames`. Only a bounded number of files are read or
+    linted ahead of the yielded results, so the memory does not grow with the
+    number of files.
+
+    Args:
+        filenames: an iterable of filenames to process. It is consumed
+            lazily so files can be linted while it is still being generated.
+        vlevel: the verbose level of the errors to report.
+        jobs: the number of worker processes to use.
+        cache: an optional `cache.ResultCache` instance to look up and store
+            the results of each file.
+        timings: an optional dict to record the time spent on each file. The
+            filename is mapped to a tuple of the ID of the process linting
+            the file, the start time, the elapsed wall time and the elapsed
+            CPU time in seconds before its results are yielded.
+        guard: an optional `FileGuard` instance limiting the size of the
+            files and the time spent on each file.
+        pruner: an optional `pruning.CheckPruner` instance to skip the checks
+            whose errors are all filtered out.
+        reader: an optional callable reading the files instead of
+            `prefetch_files()`, such as `git.Revision.read_files()`. It is
+            called with `filenames` and yields the same tuples. The contents
+            are read in the current process and sent to the worker processes.
+        baseline_index: an optional `baseline.BaselineIndex` instance. The
+            errors are fingerprinted where the files are linted, and the
+            known errors are dropped before they are yielded.
+        pool: an optional pool returned by `create_pool()` with `jobs` worker
+            processes, which is used instead of starting new ones and is not
+            closed, so it can be reused by several calls.
+
+    Yields:
+        A tuple of the filename, a list of `LintError` instances and the
+        warning message of the file.
+    """
+    refresh_caches()
+    timed = timings is not None
+    fingerprinted = baseline_index is not None
+    baseline_root = baseline_index.root if fingerprinted else None
+    own_pool = None
+    filenames = iter(filenames)
+    if jobs > 1:
+        # Only reads enough filenames to give each process a chunk.
+        first_filenames = list(itertools.islice(
+            filenames, _CHUNK_SIZE * max(2, jobs)))
+        if len(first_filenames) < _CHUNK_SIZE * 2:
+            jobs = 1
+        else:
+            jobs = min(jobs, -(-len(first_filenames) // _CHUNK_SIZE))
+        filenames = itertools.chain(first_filenames, filenames)
+    if jobs <= 1:
+        results = (_lint_file_with_name(filename, vlevel, cache, timed,
+                                        content, guard, pruner, baseline_root)
+                   for filename, content in (reader or prefetch_files)(
+                       filenames))
+    else:
+        if pool is None:
+            pool = own_pool = create_pool(jobs)
+        if reader is None:
+            function = _lint_file_with_name
+            tasks = filenames
+        else:
+            function = _lint_source_with_name
+            tasks = reader(filenames)
+        # Small chunks keep the workers balanced when some files are much
+        # slower than others, while still reducing the inter-process overhead.
+        results = _iterate_pool_results(
+            pool,
+            functools.partial(function, vlevel=vlevel, cache=cache,
+                              timed=timed, guard=guard, pruner=pruner,
+                              baseline_root=baseline_root),
+            tasks, jobs * _PENDING_CHUNKS_PER_JOB)
+    try:
+        for filename, errors, warning, timing, fingerprints in results:
+            if timed:
+                timings[filename] = timing
+            if fingerprinted:
+                errors = baseline_index.filter(errors, fingerprints)
+            yield filename, errors, warning
+        if own_pool is not None:
+            own_pool.close()
+    finally:
+        if own_pool is not None:
+            own_pool.terminate()
+            own_pool.join()
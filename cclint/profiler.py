@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains the profiler of the stages and files of a run."""
+
+from __future__ import print_function
+import collections
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+
+
+# The default number of the slowest files to print.
+_SLOWEST_FILE_COUNT = 10
+# The extension of the profile output written as a Chrome trace. Any other
+# output file is written as a pstats dump.
+_TRACE_EXTENSION = '.json'
+
+
+class Profiler(object):
+    """Records the time spent on each stage and each file of a run."""
+
+    def __init__(self, start_time, output=None, slowest_file_counts=None):
+        """Initialization.
+
+        Args:
+            start_time: the time when the run started, which is also the
+                start of the first stage.
+            output: the optional path of the file to write the profile to. A
+                Chrome trace is written if it ends with '.json', otherwise a
+                pstats dump of cProfile is written.
+            slowest_file_counts: the optional number of the slowest files to
+                print, which is 10 by default.
+        """
+        self.start_time = start_time
+        self.output = output
+        self.slowest_file_counts = slowest_file_counts or _SLOWEST_FILE_COUNT
+        # Maps the name of each stage to a list of its wall time and CPU time.
+        self.stages = collections.OrderedDict()
+        # A list of tuples of the filename, the size, the process ID, the
+        # start time, the wall time and the CPU time of each file.
+        self.files = list()
+        self.category_counts = collections.Counter()
+        self.warning_counts = 0
+        # The complete events of the Chrome trace.
+        self.trace_events = list()
+        self.cprofile = None
+        if output is not None and not output.endswith(_TRACE_EXTENSION):
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def add_stage(self, name, start_time, wall_time, cpu_time):
+        """Adds the time spent on a stage.
+
+        The time is accumulated if the stage is added more than once.
+        """
+        times = self.stages.setdefault(name, [0.0, 0.0])
+        times[0] += wall_time
+        times[1] += cpu_time
+        self._add_trace_event(name, 'stage', os.getpid(), start_time,
+                              wall_time)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Returns a context manager measuring the enclosed stage."""
+        start_time = time.time()
+        start_cpu_time = time.process_time()
+        try:
+            yield
+        finally:
+            self.add_stage(name, start_time, time.time() - start_time,
+                           time.process_time() - start_cpu_time)
+
+    def iterate_results(self, results, timings):
+        """Yields the results of `linter.lint_files()` while profiling them.
+
+        The time spent waiting for the results is added as the lint stage,
+        and the time spent by the caller between the results, which is
+        reporting them, is added as the report stage.
+
+        Args:
+            results: the iterable returned by `linter.lint_files()`.
+            timings: the dict passed as `timings` to `linter.lint_files()`.
+
+        Yields:
+            The items of `results`.
+        """
+        times = {'lint': [time.time(), 0.0, 0.0],
+                 'report': [time.time(), 0.0, 0.0]}
+        iterator = iter(results)
+        while True:
+            wall_time = time.time()
+            cpu_time = time.process_time()
+            try:
+                filename, errors, warning = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                times['lint'][1] += time.time() - wall_time
+                times['lint'][2] += time.process_time() - cpu_time
+            self.add_file(filename, timings.pop(filename), errors, warning)
+            wall_time = time.time()
+            cpu_time = time.process_time()
+            yield filename, errors, warning
+            times['report'][1] += time.time() - wall_time
+            times['report'][2] += time.process_time() - cpu_time
+        for stage in ('lint', 'report'):
+            self.add_stage(stage, *times[stage])
+
+    def add_file(self, filename, timing, errors, warning):
+        """Adds the results of a file.
+
+        Args:
+            filename: the filename of the results.
+            timing: the tuple recorded by `linter.lint_files()`.
+            errors: a list of `linter.LintError` instances of the file.
+            warning: the warning message of the file, or `None`.
+        """
+        pid, start_time, wall_time, cpu_time = timing
+        try:
+            size = os.path.getsize(filename) if filename != '-' else 0
+        except OSError:
+            size = 0
+        self.files.append((filename, size, pid, start_time, wall_time,
+                           cpu_time))
+        for error in errors:
+            self.category_counts[error.category] += 1
+        if warning is not None:
+            self.warning_counts += 1
+        self._add_trace_event(filename, 'file', pid, start_time, wall_time)
+
+    def _add_trace_event(self, name, category, pid, start_time, wall_time):
+        """Adds a complete event to the Chrome trace."""
+        if self.output is None or self.cprofile is not None:
+            return
+        self.trace_events.append({
+            'name': name, 'cat': category, 'ph': 'X', 'pid': 0, 'tid': pid,
+            'ts': int((start_time - self.start_time) * 1000000),
+            'dur': int(wall_time * 1000000)})
+
+    def finish(self, stream=None):
+        """Prints the report and writes the profile output if requested.
+
+        Args:
+            stream: the stream to print the report, which is `sys.stderr` by
+                default so the report does not mix with structured output.
+        """
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.output)
+        elif self.output is not None:
+            with open(self.output, 'w', encoding='utf8') as output_file:
+                json.dump({'traceEvents': self.trace_events,
+                           'displayTimeUnit': 'ms'}, output_file)
+        self.print_report(sys.stderr if stream is None else stream)
+
+    def print_report(self, stream):
+        """Prints the time spent on each stage and the slowest files."""
+        def write(text=''):
+            stream.write(text + '\n')
+
+        write('\n=== PROFILE ===')
+        write('\n{0:<12}{1:>12}{2:>12}'.format('Stage', 'Wall (s)',
+                                               'CPU (s)'))
+        for name, (wall_time, cpu_time) in self.stages.items():
+            write('{0:<12}{1:>12.3f}{2:>12.3f}'.format(name, wall_time,
+                                                       cpu_time))
+        # The lint stage in the parent process is the time waiting for the
+        # results, which is the elapsed time of linting with any jobs.
+        lint_time = self.stages.get('lint', [0.0])[0]
+        total_bytes = sum(item[1] for item in self.files)
+        write('\nFiles: {0:d} ({1:d} bytes)'.format(len(self.files),
+                                                    total_bytes))
+        if lint_time > 0:
+            write('Throughput: {0:.1f} files/sec, {1:.1f} KB/sec'.format(
+                len(self.files) / lint_time, total_bytes / lint_time / 1024))
+
+        if self.files:
+            write('\nSlowest files:')
+            write('{0:>10}{1:>10}{2:>10}  {3}'.format('Wall (s)', 'CPU (s)',
+                                                      'Bytes', 'File'))
+            slowest_files = sorted(self.files, key=lambda item: -item[4])
+            for item in slowest_files[:self.slowest_file_counts]:
+                write('{0:>10.3f}{1:>10.3f}{2:>10d}  {3}'.format(
+                    item[4], item[5], item[1], item[0]))
+
+        if self.category_counts or self.warning_counts:
+            write('\nErrors by category:')
+            for category, counts in sorted(
+                    self.category_counts.items(),
+                    key=lambda item: (-item[1], item[0])):
+                write('{0:>8d}  {1}'.format(counts, category))
+            if self.warning_counts:
+                write('{0:>8d}  {1}'.format(self.warning_counts,
+                                            '(files with warnings)'))
+        if self.output is not None:
+            write('\nProfile written to ' + self.output)
+        write()
+        stream.flush()
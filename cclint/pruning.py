@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""This module contains the pruning of cpplint checks disabled by filters.
+
+cpplint runs every check on every line and drops the errors of the filtered
+categories afterwards. `CheckPruner` finds the categories each check function
+can report by reading cpplint's source, and replaces the checks whose
+categories are all filtered out for a file with a function doing nothing
+while the file is linted. Only checks without effects on the state shared
+with other checks are pruned, so the reported errors are unchanged.
+"""
+
+import ast
+import contextlib
+import inspect
+import re
+import sys
+
+import cpplint
+
+
+# The names of cpplint's check functions that may be pruned. The other checks
+# update the state used by later checks, such as the included headers and the
+# NOLINT suppressions, so they always run. Checks missing in the installed
+# cpplint are ignored.
+_PRUNABLE_CHECK_NAMES = ('CheckAltTokens', 'CheckBraces', 'CheckBracesSpacing',
+                         'CheckCasts', 'CheckCheck', 'CheckCommaSpacing',
+                         'CheckEmptyBlockBody', 'CheckForBadCharacters',
+                         'CheckForCopyright', 'CheckForFunctionLengths',
+                         'CheckForMultilineCommentsAndStrings',
+                         'CheckForNamespaceIndentation',
+                         'CheckForNewlineAtEOF', 'CheckForNonConstReference',
+                         'CheckForNonStandardConstructs', 'CheckGlobalStatic',
+                         'CheckInvalidIncrement',
+                         'CheckMakePairUsesDeduction', 'CheckOperatorSpacing',
+                         'CheckParenthesisSpacing', 'CheckPosixThreading',
+                         'CheckPrintf', 'CheckRedundantOverrideOrFinal',
+                         'CheckRedundantVirtual', 'CheckSectionSpacing',
+                         'CheckSpacing', 'CheckSpacingForFunctionCall',
+                         'CheckVlogArguments', 'FlagCxxHeaders')
+# The names of cpplint's functions with effects on the state shared with
+# other checks. A check calling any of them is never pruned.
+_STATEFUL_FUNCTION_NAMES = ('CheckIncludeLine', 'ParseNolintSuppressions',
+                            'ProcessGlobalSuppressions')
+# The pattern of the string constants treated as error categories.
+_CATEGORY_PATTERN = re.compile(r'[a-z_]+/[0-9a-z_+]+\Z')
+
+
+def _prune(*args, **kwargs):  # pylint: disable=unused-argument
+    """Replaces a pruned check."""
+
+def _get_string(node):
+    """Returns the value of a string constant node, or `None`.
+
+    String literals are parsed as `ast.Str` nodes before Python 3.8.
+    """
+    if sys.version_info < (3, 8):
+        # pylint: disable=no-member
+        return node.s if isinstance(node, ast.Str) else None
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+def _get_calls(function):
+    """Collects the names and the categories used by a function.
+
+    Args:
+        function: the `ast.FunctionDef` node of a function.
+
+    Returns:
+        A tuple of a set of the referenced names, a set of the category
+        strings, whether the function reports errors with categories passed
+        as its parameters, and whether it reports errors with computed
+        categories. The names of the called methods start with '.'.
+    """
+    parameters = set(argument.arg for argument in function.args.args)
+    names = set()
+    categories = set()
+    has_parameter_category = False
+    has_unknown_category = False
+    for node in ast.walk(function):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif _get_string(node) is not None:
+            if _CATEGORY_PATTERN.match(_get_string(node)):
+                categories.add(_get_string(node))
+        elif isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name) and node.func.id == 'error':
+                category = node.args[2] if len(node.args) > 2 else None
+                if isinstance(category, ast.Name) and \
+                   category.id in parameters:
+                    has_parameter_category = True
+                elif category is None or _get_string(category) is None:
+                    has_unknown_category = True
+            elif isinstance(node.func, ast.Attribute):
+                # Methods are followed by their names in all classes.
+                names.add('.' + node.func.attr)
+    return names, categories, has_parameter_category, has_unknown_category
+
+def get_check_categories():
+    """Finds the categories of the errors reported by the prunable checks.
+
+    The source of cpplint is parsed and the functions called by each check
+    are followed. The categories passed as parameters to the called functions
+    are the constants in the calling check.
+
+    Returns:
+        A dict mapping the name of each prunable check to a frozenset of the
+        categories it may report. Checks calling stateful functions,
+        reporting errors with categories that cannot be determined or
+        without any found category are not included.
+    """
+    try:
+        tree = ast.parse(inspect.getsource(cpplint))
+    except (OSError, TypeError, SyntaxError):
+        return dict()
+    calls = dict((node.name, _get_calls(node)) for node in tree.body
+                 if isinstance(node, ast.FunctionDef))
+    # The methods with the same name in different classes are merged.
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for method in node.body:
+            if not isinstance(method, ast.FunctionDef):
+                continue
+            names, categories, has_parameter_category, \
+                has_unknown_category = _get_calls(method)
+            name = '.' + method.name
+            if name in calls:
+                names |= calls[name][0]
+                categories |= calls[name][1]
+                has_parameter_category |= calls[name][2]
+                has_unknown_category |= calls[name][3]
+            calls[name] = (names, categories, has_parameter_category,
+                           has_unknown_category)
+
+    check_categories = dict()
+    for check_name in _PRUNABLE_CHECK_NAMES:
+        if check_name not in calls or calls[check_name][2]:
+            continue
+        categories = set()
+        pending = [check_name]
+        visited = set()
+        while pending:
+            name = pending.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            names, function_categories, _, has_unknown_category = calls[name]
+            if has_unknown_category or \
+               names.intersection(_STATEFUL_FUNCTION_NAMES):
+                break
+            categories.update(function_categories)
+            pending.extend(names.intersection(calls))
+        else:
+            if categories:
+                check_categories[check_name] = frozenset(categories)
+    return check_categories
+
+def is_category_filtered(category, filename, filters):
+    """Checks whether a category is filtered out on every line of a file.
+
+    The filters are evaluated like `cpplint._ShouldPrintError()`. A filter
+    selecting a line re-enabling the category counts as re-enabling it for
+    the whole file, and a filter selecting a line disabling it is ignored.
+
+    Args:
+        category: the category string of an error.
+        filename: the filename passed to cpplint.
+        filters: a list of cpplint's filter strings, such as
+            '-whitespace/tab' or '+build/include:foo.cc:3'. The files and
+            lines are only selected by the versions of cpplint supporting
+            them.
+
+    Returns:
+        True if no error of the category can be reported for the file.
+    """
+    # pylint: disable=protected-access
+    has_selectors = hasattr(cpplint, '_ParseFilterSelector')
+    is_filtered = False
+    for one_filter in filters:
+        if has_selectors:
+            selector = one_filter[1:].split(':', 2)
+        else:
+            selector = [one_filter[1:]]
+        if not category.startswith(selector[0]):
+            continue
+        if len(selector) > 1 and selector[1] not in ('', filename):
+            continue
+        if len(selector) > 2:
+            if one_filter.startswith('+'):
+                is_filtered = False
+        else:
+            is_filtered = one_filter.startswith('-')
+    return is_filtered
+
+
+class CheckPruner(object):
+    """The pruner of cpplint checks whose categories are all filtered out.
+
+    The categories of the checks are found when the first file is pruned.
+    The pruned checks are computed once for each set of filters, or for each
+    file if the filters select files.
+    """
+
+    def __init__(self):
+        """Initialization."""
+        self._check_categories = None
+        self._pruned_checks = dict()
+
+    def __getstate__(self):
+        # Each process finds the categories by itself.
+        return dict()
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def get_pruned_checks(self, filename):
+        """Returns the names of the checks to prune for a file.
+
+        Args:
+            filename: the filename passed to cpplint.
+
+        Returns:
+            A tuple of the names of cpplint's check functions.
+        """
+        # pylint: disable=protected-access
+        if self._check_categories is None:
+            self._check_categories = get_check_categories()
+        filters = tuple(cpplint._Filters())
+        key = filters
+        if any(':' in one_filter for one_filter in filters):
+            key = (filters, filename)
+        pruned_checks = self._pruned_checks.get(key)
+        if pruned_checks is None:
+            pruned_checks = tuple(sorted(
+                name for name, categories in self._check_categories.items()
+                if categories and
+                all(is_category_filtered(category, filename, filters)
+                    for category in categories)))
+            self._pruned_checks[key] = pruned_checks
+        return pruned_checks
+
+    @contextlib.contextmanager
+    def prune(self, filename):
+        """Replaces the pruned checks of a file within the context.
+
+        cpplint's functions are replaced at the module level, so the caller
+        must prevent cpplint from being used by other threads meanwhile.
+
+        Args:
+            filename: the filename passed to cpplint.
+        """
+        originals = [(name, getattr(cpplint, name))
+                     for name in self.get_pruned_checks(filename)]
+        for name, _ in originals:
+            setattr(cpplint, name, _prune)
+        try:
+            yield
+        finally:
+            for name, function in originals:
+                setattr(cpplint, name, function)
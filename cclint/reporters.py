@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains the reporters writing machine-readable results.
+
+Each reporter is an alternative of `file_stream.FileStream` and can be used
+in the same way, except that `start()` and `finish()` should be called
+before and after all files are reported:
+
+    reporter = JSONLinesReporter(sys.stdout)
+    reporter.start()
+    for filename, errors, warning in linter.lint_files(filenames, vlevel):
+        reporter.report(filename, errors, warning)
+    reporter.finish()
+
+All results are written incrementally so the memory usage does not grow with
+the number of reported files.
+"""
+
+import json
+import os
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
+
+
+# The URL of the SARIF schema written in the SARIF output.
+_SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+# The URL of the cclint project written in the SARIF output.
+_CCLINT_URL = 'https://github.com/ollix/cclint'
+
+
+class Reporter(object):
+    """The base class of reporters.
+
+    It writes each error on its own line in cpplint's default 'emacs'
+    format. Subclasses override `write_file()`, and `start()` and `finish()`
+    if their output has a beginning and an end.
+    """
+
+    def __init__(self, stream):
+        """Initialization.
+
+        Args:
+            stream: the text stream to write the results.
+        """
+        self.stream = stream
+        self.total_error_counts = 0
+
+    def start(self):
+        """Writes the beginning of the results."""
+
+    def report(self, filename, errors, warning):
+        """Reports the results of a file.
+
+        Args:
+            filename: the processed filename.
+            errors: a list of `linter.LintError` instances.
+            warning: the warning message of the file, or `None`.
+        """
+        self.total_error_counts += len(errors)
+        self.write_file(filename, errors, warning)
+
+    def write_file(self, filename, errors, warning):
+        """Writes the results of a file.
+
+        Args:
+            filename: the processed filename.
+            errors: a list of `linter.LintError` instances.
+            warning: the warning message of the file, or `None`.
+        """
+        write = self.stream.write
+        for error in errors:
+            write('{0}:{1:d}:  {2}  [{3}] [{4:d}]\n'.format(
+                error.filename, error.line, error.message, error.category,
+                error.confidence))
+        if warning is not None:
+            write('{0}: {1}\n'.format(filename, warning))
+
+    def finish(self):
+        """Writes the end of the results."""
+        self.stream.flush()
+
+
+class JSONLinesReporter(Reporter):
+    """The reporter writing a JSON object per line.
+
+    Each error is written as an object of type "error". After the errors of a
+    file, an object of type "file" summarizes the file with its number of
+    errors and its warning message.
+    """
+
+    def write_file(self, filename, errors, warning):
+        """Writes the results of a file."""
+        write = self.stream.write
+        for error in errors:
+            write(json.dumps({'type': 'error',
+                              'file': error.filename,
+                              'line': error.line,
+                              'category': error.category,
+                              'confidence': error.confidence,
+                              'message': error.message}) + '\n')
+        write(json.dumps({'type': 'file',
+                          'file': filename,
+                          'errors': len(errors),
+                          'warning': warning}) + '\n')
+
+
+class SARIFReporter(Reporter):
+    """The reporter writing a SARIF 2.1.0 log.
+
+    Errors are written as results of level "warning" with the cpplint
+    category as the rule ID. Warnings such as skipped files are written as
+    results of kind "notApplicable".
+    """
+
+    def __init__(self, stream):
+        """Initialization."""
+        Reporter.__init__(self, stream)
+        self._has_results = False
+
+    def start(self):
+        """Writes the beginning of the log."""
+        self.stream.write(
+            '{{"version": "2.1.0", "$schema": {0}, "runs": [{{'
+            '"tool": {{"driver": {{"name": "cclint", '
+            '"informationUri": {1}}}}}, "results": ['.format(
+                json.dumps(_SARIF_SCHEMA), json.dumps(_CCLINT_URL)))
+
+    def _write_result(self, result):
+        """Writes a result object."""
+        if self._has_results:
+            self.stream.write(',')
+        self.stream.write('\n' + json.dumps(result))
+        self._has_results = True
+
+    @staticmethod
+    def _get_location(filename, line=0):
+        """Creates a location object of a file and an optional line."""
+        physical_location = {
+            'artifactLocation': {
+                'uri': quote(filename.replace(os.sep, '/'))}}
+        if line > 0:
+            physical_location['region'] = {'startLine': line}
+        return {'physicalLocation': physical_location}
+
+    def write_file(self, filename, errors, warning):
+        """Writes the results of a file."""
+        for error in errors:
+            self._write_result({
+                'ruleId': error.category,
+                'level': 'warning',
+                'message': {'text': error.message},
+                'locations': [self._get_location(error.filename,
+                                                 error.line)],
+                'properties': {'confidence': error.confidence}})
+        if warning is not None:
+            self._write_result({
+                'kind': 'notApplicable',
+                'level': 'none',
+                'message': {'text': warning},
+                'locations': [self._get_location(filename)]})
+
+    def finish(self):
+        """Writes the end of the log."""
+        self.stream.write('\n]}]}\n')
+        Reporter.finish(self)
+
+
+class JUnitReporter(Reporter):
+    """The reporter writing a JUnit XML report.
+
+    Each file is written as a test case. Files with errors are failed test
+    cases and files with warnings are skipped test cases.
+    """
+
+    def start(self):
+        """Writes the beginning of the report."""
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                          '<testsuites>\n<testsuite name="cclint">\n')
+
+    def write_file(self, filename, errors, warning):
+        """Writes the results of a file."""
+        write = self.stream.write
+        write('<testcase classname="cclint" name={0}'.format(
+            quoteattr(filename)))
+        if errors:
+            write('>\n<failure message={0}>'.format(
+                quoteattr('{0:d} errors found'.format(len(errors)))))
+            for error in errors:
+                write(escape('{0}:{1:d}: {2} [{3}] [{4:d}]\n'.format(
+                    error.filename, error.line, error.message,
+                    error.category, error.confidence)))
+            write('</failure>\n</testcase>\n')
+        elif warning is not None:
+            write('>\n<skipped message={0}/>\n</testcase>\n'.format(
+                quoteattr(warning)))
+        else:
+            write('/>\n')
+
+    def finish(self):
+        """Writes the end of the report."""
+        self.stream.write('</testsuite>\n</testsuites>\n')
+        Reporter.finish(self)
+
+
+# The reporters available to the `output-format` flag.
+REPORTERS = {'jsonl': JSONLinesReporter,
+             'junit': JUnitReporter,
+             'sarif': SARIFReporter}
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""This module contains the cache of the repository names of files.
+
+cpplint walks up the parent directories of a file looking for the root of
+its repository, many times for each file with many includes. The cache keeps
+a limited number of the found repository names, evicting the least recently
+used ones first.
+"""
+
+import collections
+import contextlib
+
+import cpplint
+
+
+# The original method finding the repository name of a file.
+_REPOSITORY_NAME = cpplint.FileInfo.RepositoryName
+# The default maximum number of the cached repository names.
+_DEFAULT_MAX_SIZE = 1024
+
+
+class RepositoryNameCache(object):
+    """The cache of `cpplint.FileInfo.RepositoryName()`.
+
+    The cache is not locked, so it must only be used while cpplint is used
+    by a single thread, which `linter` ensures with its lock.
+    """
+
+    def __init__(self, max_size=_DEFAULT_MAX_SIZE):
+        """Initialization.
+
+        Args:
+            max_size: the maximum number of the cached repository names.
+        """
+        self.max_size = max_size
+        # Maps a tuple of the absolute path of a file and cpplint's
+        # repository setting to the repository name of the file, with the
+        # least recently used one first.
+        self._names = collections.OrderedDict()
+
+    def refresh(self):
+        """Forgets the cached names so moved repositories are noticed."""
+        self._names.clear()
+
+    def get_repository_name(self, file_info):
+        """Returns `cpplint.FileInfo.RepositoryName()` through the cache."""
+        # pylint: disable=protected-access
+        key = (file_info.FullName(), cpplint._repository)
+        name = self._names.get(key)
+        if name is not None:
+            self._names.move_to_end(key)
+            return name
+        name = self._names[key] = _REPOSITORY_NAME(file_info)
+        if len(self._names) > self.max_size:
+            self._names.popitem(last=False)
+        return name
+
+    @contextlib.contextmanager
+    def install(self):
+        """Makes cpplint find repository names through the cache.
+
+        `cpplint.FileInfo.RepositoryName` is replaced within the context, so
+        the caller must prevent cpplint from being used by other threads
+        meanwhile.
+        """
+        def get_repository_name(file_info):
+            return self.get_repository_name(file_info)
+
+        cpplint.FileInfo.RepositoryName = get_repository_name
+        try:
+            yield
+        finally:
+            cpplint.FileInfo.RepositoryName = _REPOSITORY_NAME
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains the lint daemon and its client.
+
+The daemon listens on a Unix domain socket with cpplint already imported.
+For each request it forks a child process, which takes over the client's
+stdin, stdout and stderr through the socket and runs the command line client
+with the client's arguments, working directory and environment. So the
+output and the exit code are exactly the same as running cclint directly,
+without paying for the interpreter startup and the imports every time.
+
+Because the client sends its environment and streams to the daemon, both
+sides check that the other end of the socket belongs to the same user, and
+the socket is placed in a directory only the user can access.
+
+This module only imports the lightweight parts of the standard library at the
+module level so the client starts as fast as possible.
+"""
+
+from __future__ import print_function
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+
+
+# The flags handled by this module before any other arguments are parsed.
+_SERVE_FLAG = '--serve'
+_CLIENT_FLAG = '--client'
+_SOCKET_FLAG = '--socket='
+# The format of the header sent before a request, which contains the length
+# of the request.
+_HEADER_FORMAT = '!I'
+# The format of the message sent by the child process before running the
+# command line client, which contains its process ID.
+_PID_FORMAT = '!i'
+# The format of the response, which contains the exit code.
+_RESPONSE_FORMAT = '!i'
+# The signals the client forwards to the child process running its request.
+_FORWARDED_SIGNALS = ('SIGINT', 'SIGTERM', 'SIGHUP')
+# The number of file descriptors sent with a request.
+_FD_COUNT = 3
+
+
+def _get_fallback_dirname():
+    """Returns the private directory of the socket without a runtime dir."""
+    return os.path.join('/tmp', 'cclint-{0:d}'.format(os.getuid()))
+
+def get_default_socket_path():
+    """Returns the default path of the daemon's socket for the current user."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, 'cclint.sock')
+    return os.path.join(_get_fallback_dirname(), 'cclint.sock')
+
+def _is_private_path(path):
+    """Returns whether a path is owned by and only accessible to the user."""
+    try:
+        path_stat = os.lstat(path)
+    except OSError:
+        return False
+    return path_stat.st_uid == os.getuid() and \
+        not path_stat.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+
+def _make_private_dir(dirname):
+    """Creates a directory only the user can access if it does not exist.
+
+    Returns:
+        False if the directory exists but is not private to the user.
+    """
+    try:
+        os.mkdir(dirname, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+    return os.path.isdir(dirname) and _is_private_path(dirname)
+
+def _is_trusted_peer(connection, socket_path):
+    """Returns whether the other end of a socket belongs to the same user.
+
+    The credentials of the peer are checked when the platform supports
+    `SO_PEERCRED`. Otherwise the socket file and its directory must be
+    private to the user, so no one else could have bound it.
+    """
+    if hasattr(socket, 'SO_PEERCRED'):
+        credentials_format = '3i'
+        try:
+            credentials = connection.getsockopt(
+                socket.SOL_SOCKET, socket.SO_PEERCRED,
+                struct.calcsize(credentials_format))
+        except OSError:
+            return False
+        _, uid, _ = struct.unpack(credentials_format, credentials)
+        return uid == os.getuid()
+    return _is_private_path(socket_path) and \
+        _is_private_path(os.path.dirname(os.path.abspath(socket_path)))
+
+def parse_arguments(args):
+    """Separates the daemon's flags from the other arguments.
+
+    Args:
+        args: the list of command line arguments without the program name.
+
+    Returns:
+        A tuple of the mode, the socket path and the remaining arguments. The
+        mode is 'serve', 'client' or `None`.
+    """
+    mode = None
+    socket_path = None
+    remaining_args = list()
+    for arg in args:
+        if arg == _SERVE_FLAG:
+            mode = 'serve'
+        elif arg == _CLIENT_FLAG:
+            mode = mode or 'client'
+        elif arg.startswith(_SOCKET_FLAG):
+            socket_path = arg[len(_SOCKET_FLAG):]
+        else:
+            remaining_args.append(arg)
+    return mode, socket_path or get_default_socket_path(), remaining_args
+
+def _receive_exactly(connection, size):
+    """Receives exactly `size` bytes, or fewer if the connection closes."""
+    chunks = list()
+    while size > 0:
+        chunk = connection.recv(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def run_client(socket_path, args):
+    """Runs the command line client through the daemon.
+
+    Args:
+        socket_path: the path of the daemon's socket.
+        args: the list of command line arguments without the program name.
+
+    Returns:
+        The exit code, or `None` if the daemon is not available.
+    """
+    if not hasattr(socket, 'send_fds') or not hasattr(socket, 'AF_UNIX'):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        connection.close()
+        return None
+
+    with connection:
+        if not _is_trusted_peer(connection, socket_path):
+            print('cclint: ignoring the daemon on {0} because it belongs to '
+                  'another user'.format(socket_path), file=sys.stderr)
+            return None
+
+        request = json.dumps({'args': args,
+                              'cwd': os.getcwd(),
+                              'env': dict(os.environ)}).encode('utf8')
+        sys.stdout.flush()
+        sys.stderr.flush()
+        socket.send_fds(connection,
+                        [struct.pack(_HEADER_FORMAT, len(request))],
+                        [0, 1, 2])
+        connection.sendall(request)
+
+        pid_message = _receive_exactly(connection,
+                                       struct.calcsize(_PID_FORMAT))
+        forwarded_signals = list()
+        if len(pid_message) == struct.calcsize(_PID_FORMAT):
+            child_pid = struct.unpack(_PID_FORMAT, pid_message)[0]
+            previous_handlers = _forward_signals(child_pid, forwarded_signals)
+            try:
+                response = _receive_exactly(
+                    connection, struct.calcsize(_RESPONSE_FORMAT))
+            finally:
+                for signum, handler in previous_handlers.items():
+                    signal.signal(signum, handler)
+        else:
+            response = b''
+    if len(response) != struct.calcsize(_RESPONSE_FORMAT):
+        if forwarded_signals:
+            return 128 + forwarded_signals[-1]
+        print('cclint: the daemon closed the connection unexpectedly',
+              file=sys.stderr)
+        return 1
+    return struct.unpack(_RESPONSE_FORMAT, response)[0]
+
+def _forward_signals(child_pid, forwarded_signals):
+    """Forwards the signals received by the client to the child process.
+
+    Args:
+        child_pid: the process ID of the daemon's child running the request.
+        forwarded_signals: the list to append each forwarded signal number.
+
+    Returns:
+        A dict mapping each signal number to its previous handler.
+    """
+    def forward(signum, frame):  # pylint: disable=unused-argument
+        forwarded_signals.append(signum)
+        try:
+            os.kill(child_pid, signum)
+        except OSError:
+            pass
+
+    previous_handlers = dict()
+    for name in _FORWARDED_SIGNALS:
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            previous_handlers[signum] = signal.signal(signum, forward)
+    return previous_handlers
+
+def _get_exit_code(error):
+    """Converts a `SystemExit` exception to an exit code like Python does."""
+    if error.code is None:
+        return 0
+    if isinstance(error.code, int):
+        return error.code
+    print(error.code, file=sys.stderr)
+    return 1
+
+def _handle_request(connection, execute):
+    """Handles a request in the forked child process.
+
+    Args:
+        connection: the socket connected to the client.
+        execute: the function running the command line client.
+
+    Returns:
+        The exit code of the command line client.
+    """
+    header_size = struct.calcsize(_HEADER_FORMAT)
+    header, fds, _, _ = socket.recv_fds(connection, header_size, _FD_COUNT)
+    header += _receive_exactly(connection, header_size - len(header))
+    if len(header) != header_size or len(fds) != _FD_COUNT:
+        return 1
+    request_size = struct.unpack(_HEADER_FORMAT, header)[0]
+    request = json.loads(_receive_exactly(connection,
+                                          request_size).decode('utf8'))
+    # Lets the client forward the signals it receives, such as Ctrl-C.
+    connection.sendall(struct.pack(_PID_FORMAT, os.getpid()))
+
+    # Takes over the client's working directory, environment and streams.
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    for target_fd, fd in enumerate(fds):
+        os.dup2(fd, target_fd)
+        os.close(fd)
+    # Whether to colorize the output depends on the client's stdout.
+    from cclint import utility
+    utility.init_colors()
+
+    sys.argv = ['cclint'] + request['args']
+    try:
+        execute()
+        exit_code = 0
+    except SystemExit as error:
+        exit_code = _get_exit_code(error)
+    except KeyboardInterrupt:
+        exit_code = 128 + signal.SIGINT
+    except Exception:  # pylint: disable=broad-except
+        import traceback
+        traceback.print_exc()
+        exit_code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return exit_code
+
+def serve(socket_path, execute):
+    """Runs the daemon until interrupted.
+
+    Args:
+        socket_path: the path of the socket to listen on.
+        execute: the function running the command line client. It is called
+            in a forked child process for each request.
+    """
+    if not hasattr(socket, 'recv_fds') or not hasattr(socket, 'AF_UNIX'):
+        sys.exit('cclint: the daemon requires Python 3.9 or later and Unix '
+                 'domain sockets')
+
+    socket_dirname = os.path.dirname(os.path.abspath(socket_path))
+    if socket_dirname == _get_fallback_dirname() and \
+       not _make_private_dir(socket_dirname):
+        sys.exit('cclint: {0} must be a directory only accessible to the '
+                 'current user'.format(socket_dirname))
+
+    # Refuses to replace the socket of a running daemon, but removes the
+    # socket left by a daemon that has exited.
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.remove(socket_path)
+        else:
+            sys.exit('cclint: a daemon is already listening on ' +
+                     socket_path)
+        finally:
+            probe.close()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous_umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(previous_umask)
+    listener.listen(64)
+    # Lets the kernel reap the exited children, and removes the socket when
+    # terminated.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print('cclint: listening on ' + socket_path, file=sys.stderr)
+
+    try:
+        while True:
+            connection, _ = listener.accept()
+            # Without peer credentials, the permissions of the socket keep
+            # other users away.
+            if hasattr(socket, 'SO_PEERCRED') and \
+               not _is_trusted_peer(connection, socket_path):
+                connection.close()
+                continue
+            if os.fork() == 0:
+                exit_code = 1
+                try:
+                    listener.close()
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    exit_code = _handle_request(connection, execute)
+                    connection.sendall(struct.pack(_RESPONSE_FORMAT,
+                                                   exit_code))
+                except Exception:  # pylint: disable=broad-except
+                    import traceback
+                    traceback.print_exc()
+                finally:
+                    os._exit(exit_code)  # pylint: disable=protected-access
+            connection.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        os.remove(socket_path)
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains functions to split files into shards and merge them.
+
+Files are assigned to shards by their estimated cost, which is the duration
+recorded in a Chrome trace written by `--profile-output` of a previous run,
+or the file size otherwise. The assignment only depends on the filenames and
+the costs, so every machine running a shard of the same tree agrees on it.
+"""
+
+import heapq
+import json
+import os
+
+from cclint import linter
+
+
+def parse_shard(value):
+    """Parses the value of the `shard` flag.
+
+    Args:
+        value: a string of the 1-based shard index and the number of shards
+            separated by '/', such as '2/4'.
+
+    Returns:
+        A tuple of the 0-based shard index and the number of shards.
+
+    Raises:
+        ValueError: if the value is invalid.
+    """
+    index, count = [int(number) for number in value.split('/')]
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError('Invalid shard: {0}'.format(value))
+    return index - 1, count
+
+def load_durations(filename):
+    """Loads the duration of each file from a Chrome trace.
+
+    Args:
+        filename: the filename of a Chrome trace written by
+            `profiler.Profiler`.
+
+    Returns:
+        A dict mapping each linted filename to its duration in seconds.
+
+    Raises:
+        IOError: if the file cannot be read.
+        ValueError: if the file is not a Chrome trace.
+    """
+    with open(filename, encoding='utf8') as trace_file:
+        trace = json.load(trace_file)
+    durations = dict()
+    for event in trace['traceEvents']:
+        if event.get('cat') == 'file':
+            durations[event['name']] = event['dur'] / 1000000.0
+    return durations
+
+def get_costs(filenames, durations=None):
+    """Estimates the cost of linting each file.
+
+    Args:
+        filenames: a list of filenames.
+        durations: an optional dict returned by `load_durations()`. The files
+            without a duration are estimated by their sizes at the average
+            speed of the files with a duration.
+
+    Returns:
+        A list of the costs of the files in the same order.
+    """
+    sizes = list()
+    for filename in filenames:
+        try:
+            sizes.append(os.path.getsize(filename))
+        except OSError:
+            sizes.append(0)
+    if not durations:
+        return sizes
+
+    known_sizes = 0
+    known_durations = 0.0
+    for filename, size in zip(filenames, sizes):
+        if filename in durations:
+            known_sizes += size
+            known_durations += durations[filename]
+    seconds_per_byte = known_durations / known_sizes if known_sizes else 0.0
+    return [durations.get(filename, size * seconds_per_byte)
+            for filename, size in zip(filenames, sizes)]
+
+def select_shard(filenames, index, count, durations=None):
+    """Selects the files of a shard.
+
+    The files are assigned from the most costly one to the shard with the
+    least total cost so far, which balances the shards by cost instead of by
+    the number of files.
+
+    Args:
+        filenames: an iterable of all filenames to process.
+        index: the 0-based index of the shard to select.
+        count: the number of shards.
+        durations: an optional dict returned by `load_durations()`.
+
+    Returns:
+        A list of the filenames of the shard in their original order.
+    """
+    filenames = list(filenames)
+    costs = get_costs(filenames, durations)
+    # A heap of the total cost and the index of each shard.
+    shards = [(0, shard) for shard in range(count)]
+    selected = [False] * len(filenames)
+    for position in sorted(range(len(filenames)),
+                           key=lambda i: (-costs[i], filenames[i])):
+        shard_cost, shard = shards[0]
+        heapq.heapreplace(shards, (shard_cost + costs[position], shard))
+        selected[position] = shard == index
+    return [filename for filename, is_selected in zip(filenames, selected)
+            if is_selected]
+
+def _get_walk_order_key(filename):
+    """Returns the sort key of a filename in the order of walking directories.
+
+    The files within a directory come before its subdirectories, which is
+    the order of `utility.expand_directory()`.
+    """
+    components = os.path.normpath(filename).split(os.sep)
+    return [(1, name) for name in components[:-1]] + [(0, components[-1])]
+
+def read_results(filenames):
+    """Reads the results written by `--output-format=jsonl` of shards.
+
+    Args:
+        filenames: a list of the JSON Lines filenames of the shards.
+
+    Returns:
+        A list of tuples of the filename, a list of `linter.LintError`
+        instances and the warning message of each linted file, sorted in the
+        order of walking directories.
+
+    Raises:
+        IOError: if a file cannot be read.
+        ValueError: if a file is not written by the JSON Lines reporter.
+    """
+    results = list()
+    for filename in filenames:
+        errors = list()
+        with open(filename, encoding='utf8') as results_file:
+            for line in results_file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record['type'] == 'error':
+                    errors.append(linter.LintError(
+                        record['file'], record['line'], record['category'],
+                        record['confidence'], record['message']))
+                elif record['type'] == 'file':
+                    results.append((record['file'], errors,
+                                    record['warning']))
+                    errors = list()
+    results.sort(key=lambda result: _get_walk_order_key(result[0]))
+    return results
@@ -31,55 +31,192 @@
 """A collection of utility functions."""
 
 import os
+import sys
 
-import colorama
 import cpplint
 
+from cclint import ignore
 
-# Initializes the colorama library so the `get_ansi_code()` function can work
-# properly.
-colorama.init()
 
-_valid_cpp_extensions = cpplint.GetAllExtensions()
+# Whether `get_ansi_code()` returns ANSI codes. It is decided by
+# `init_colors()` on first use.
+_colors_enabled = None
 
 
-def expand_directory(dirname, filenames=None, recursive=False,
-                     exclude_dirs=None, exclude_paths=None):
+def expand_directory(dirname, recursive=False, exclusion=None,
+                     ignore_files=False, on_directory=None):
     """Searches files with matched extensions within a directory.
 
+    This function walks the directory iteratively with `os.scandir()` and
+    yields each matched file as soon as it is found, so the files can be
+    processed before the walk finishes. Entries within a directory are
+    visited in sorted order. Excluded directories are pruned without being
+    listed. Symbolic links are followed, but each file and directory is only
+    visited once as identified by its device and inode numbers, which also
+    prevents following symbolic link loops.
+
+    Only the directories and the targets of symbolic links to files are
+    remembered, so the memory does not grow with the number of files. A
+    symbolic link to a file with matched extensions in an already visited
+    directory is skipped, since the file has been considered there.
+
     Args:
         dirname: The directory to search for.
-        filenames: The list of filenames to return. This variable is used when
-            using this function as a recursive function. This function enters
-            recursive mode when the `recursive` parameter is `True`.
         recursive: Whether to search files within subdirectories recursively.
-        excludedirs: A list of directories to exclude from searching.
+        exclusion: An optional `exclusion.ExclusionIndex` instance of the
+            excluded files and directories.
+        ignore_files: Whether to skip the files and directories ignored by
+            the `.gitignore` and `.cclintignore` files, which are loaded
+            from each walked directory and its parent directories within the
+            git repository. `.git` directories are skipped as well.
+        on_directory: An optional callable called with each walked
+            directory, including those without matched files.
+
+    Yields:
+        The matched filenames.
+    """
+    valid_extensions = cpplint.GetAllExtensions()
+    node = None
+    check_patterns = False
+    if exclusion is not None:
+        node = exclusion.get_node(dirname)
+        check_patterns = exclusion.has_patterns
+        if node is True or \
+           (check_patterns and exclusion.matches_patterns(dirname, True)):
+            return
+
+    # The rules of ignore files of the directories containing each pending
+    # directory, ordered from the outermost directory.
+    rules = tuple()
+    if ignore_files:
+        rules = tuple(ignore.load_parent_rules(dirname))
+
+    visited_dirs = set()
+    linked_files = set()
+    pending_dirs = [(dirname, node, os.path.abspath(dirname), rules)]
+    while pending_dirs:
+        dirname, node, absolute_dirname, rules = pending_dirs.pop()
+        try:
+            stat = os.stat(dirname)
+            entries = sorted(os.scandir(dirname), key=lambda e: e.name)
+        except OSError:
+            continue
+        if (stat.st_dev, stat.st_ino) in visited_dirs:
+            continue
+        visited_dirs.add((stat.st_dev, stat.st_ino))
+        if on_directory is not None:
+            on_directory(dirname)
+        if ignore_files:
+            dir_rules = ignore.load_rules(
+                absolute_dirname, set(entry.name for entry in entries))
+            if dir_rules is not None:
+                rules += (dir_rules,)
+
+        subdirs = list()
+        for entry in entries:
+            child_node = None
+            if node is not None:
+                child_node = exclusion.get_child_node(node, entry.name)
+                if child_node is True:
+                    continue
+            try:
+                if entry.is_dir():
+                    if not recursive or \
+                       (check_patterns and
+                        exclusion.matches_patterns(entry.path, True)):
+                        continue
+                    absolute_path = os.path.join(absolute_dirname, entry.name)
+                    if ignore_files and \
+                       (entry.name == '.git' or
+                        ignore.is_ignored(rules, absolute_path, True)):
+                        continue
+                    subdirs.append((entry.path, child_node, absolute_path,
+                                    rules))
+                    continue
+                if os.path.splitext(entry.name)[1][1:] not in \
+                   valid_extensions or not entry.is_file() or \
+                   (check_patterns and
+                    exclusion.matches_patterns(entry.path, False)) or \
+                   (rules and ignore.is_ignored(
+                       rules, os.path.join(absolute_dirname, entry.name),
+                       False)):
+                    continue
+                # Files reached through symbolic links need to be resolved to
+                # find duplicates. Others are only reached through their
+                # directories, which are visited once.
+                if entry.is_symlink():
+                    entry_stat = entry.stat()
+                    file_id = (entry_stat.st_dev, entry_stat.st_ino)
+                    if file_id in linked_files or \
+                       _is_visited_target(entry.path, visited_dirs,
+                                          valid_extensions):
+                        continue
+                    linked_files.add(file_id)
+                elif linked_files and \
+                        (stat.st_dev, entry.inode()) in linked_files:
+                    continue
+            except OSError:
+                continue
+            yield entry.path
+
+        # Visits subdirectories in sorted order after the current directory.
+        pending_dirs.extend(reversed(subdirs))
+
+def _is_visited_target(path, visited_dirs, valid_extensions):
+    """Checks if a symbolic link to a file targets a visited matched file.
+
+    Args:
+        path: the path of the symbolic link.
+        visited_dirs: the set of the device and inode numbers of the visited
+            directories.
+        valid_extensions: the collection of the matched extensions.
 
     Returns:
-        A list of matched filenames.
-    """
+        True if the target has matched extensions and its directory is
+        visited.
 
-    # pylint: disable=protected-access
-    if exclude_dirs is not None and dirname in exclude_dirs:
-        return list()
+    Raises:
+        OSError: if the directory of the target cannot be accessed.
+    """
+    target = os.path.realpath(path)
+    if os.path.splitext(target)[1][1:] not in valid_extensions:
+        return False
+    dir_stat = os.stat(os.path.dirname(target))
+    return (dir_stat.st_dev, dir_stat.st_ino) in visited_dirs
 
-    if filenames is None:
-        filenames = list()
-    if exclude_paths is None:
-        exclude_paths = list()
+def filter_filenames(filenames, exclusion=None):
+    """Filters filenames with the same rules applied by `expand_directory()`.
 
-    for item in os.listdir(dirname):
-        filename = os.path.join(dirname, item)
-        if os.path.isdir(filename):
-            if recursive:
-                expand_directory(filename, filenames, True, exclude_dirs,
-                                 exclude_paths)
-        elif os.path.isfile(filename) and \
-             os.path.splitext(item)[1][1:] in _valid_cpp_extensions and \
-             os.path.abspath(filename) not in exclude_paths:
-            filenames.append(filename)
+    Args:
+        filenames: an iterable of filenames to filter.
+        exclusion: An optional `exclusion.ExclusionIndex` instance of the
+            excluded files and directories.
 
-    return filenames
+    Returns:
+        A list of existing filenames with matched extensions that are not
+        excluded.
+    """
+    valid_extensions = cpplint.GetAllExtensions()
+    return [filename for filename in filenames
+            if os.path.splitext(filename)[1][1:] in valid_extensions and
+            os.path.isfile(filename) and
+            (exclusion is None or not exclusion.is_excluded(filename))]
+
+def init_colors():
+    """Decides whether to colorize the output by checking stdout.
+
+    The output is only colorized if stdout is a terminal, in which case the
+    'colorama' library is initialized to translate ANSI codes on Windows.
+    Otherwise `get_ansi_code()` returns empty strings, so files and pipes do
+    not receive any ANSI codes and colorama is not even imported.
+    """
+    global _colors_enabled  # pylint: disable=global-statement
+    _colors_enabled = sys.stdout.isatty()
+    if _colors_enabled or 'colorama' in sys.modules:
+        import colorama
+        colorama.deinit()
+        if _colors_enabled:
+            colorama.init()
 
 def get_ansi_code(name):
     """Converts the specified argument to the corresponded ANSI code.
@@ -99,8 +236,15 @@ def get_ansi_code(name):
 
 
     Returns:
-        A string of ANSI code corresponded to the passed name.
+        A string of ANSI code corresponded to the passed name, or an empty
+        string if the output is not colorized.
     """
+    if _colors_enabled is None:
+        init_colors()
+    if not _colors_enabled:
+        return ''
+
+    import colorama
     category, attribute = name.split('_', 1)
     if category == 'FOREGROUND':
         return getattr(colorama.Fore, attribute)
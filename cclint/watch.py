@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""This module contains the watcher to lint files again when they change."""
+
+from __future__ import print_function
+import contextlib
+import io
+import os
+import sys
+import time
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+import cpplint
+
+from cclint import linter
+from cclint import utility
+
+
+# The interval in seconds between checks of the watched files.
+_POLL_INTERVAL = 0.1
+# The interval in seconds between full rescans to find added and removed
+# files when polling.
+_RESCAN_INTERVAL = 2.0
+# The ANSI code moving the cursor home and clearing the terminal.
+_CLEAR_SCREEN = '\033[H\033[2J'
+
+
+def _get_signature(filename):
+    """Returns the modification time and size of a file, or `None`."""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class Watcher(object):
+    """The watcher to lint files again when they change.
+
+    The files are checked with the inotify API when the optional
+    'inotify_simple' package is available, in which case every walked
+    directory is watched and the directories are only rescanned after
+    entries are added, moved or removed. Otherwise the modification times and
+    sizes of the files are polled, and the directories are rescanned
+    periodically to find added and removed files. Only the changed files are
+    linted again, so cpplint is imported and initialized only once in the
+    current process, and the worker processes are started once as well.
+
+    When stdout is a terminal, the results of the files with errors or
+    warnings are kept and the terminal is redrawn after each change, so only
+    the entries of the changed files are formatted again and the screen
+    shows the current results. Otherwise the results are appended.
+    """
+
+    def __init__(self, collect_filenames, vlevel, stream, cache=None,
+                 guard=None, pruner=None, jobs=1):
+        """Initialization.
+
+        Args:
+            collect_filenames: a callable returning an iterable of the
+                filenames to watch. It is called with a callable, or `None`,
+                to be called with each walked directory.
+            vlevel: the verbose level of the errors to report.
+            stream: the `file_stream.FileStream` instance to print results.
+            cache: an optional `cache.ResultCache` instance.
+            guard: an optional `linter.FileGuard` instance.
+            pruner: an optional `pruning.CheckPruner` instance.
+            jobs: the number of worker processes to lint the files with.
+        """
+        self.collect_filenames = collect_filenames
+        self.vlevel = vlevel
+        self.stream = stream
+        self.cache = cache
+        self.guard = guard
+        self.pruner = pruner
+        self.jobs = jobs
+        self.signatures = dict()
+        self.error_counts = dict()
+        self._extensions = cpplint.GetAllExtensions()
+        # Maps the normalized path of each watched file to its filename.
+        self._filenames_by_path = dict()
+        # Maps each file with errors or warnings to its formatted results
+        # when the terminal is redrawn, or `None` otherwise.
+        self._entries = dict() if sys.stdout.isatty() else None
+        self._pool = None
+        self._inotify = None
+        # Maps each watch descriptor to its directory, and the reverse.
+        self._watched_dirs = dict()
+        self._watch_descriptors = dict()
+        if inotify_simple is not None:
+            try:
+                self._inotify = inotify_simple.INotify()
+            except OSError:
+                self._inotify = None
+
+    @property
+    def total_error_counts(self):
+        """The total number of errors of the watched files."""
+        return sum(self.error_counts.values())
+
+    def _watch_directory(self, dirname):
+        """Adds an inotify watch on a directory if it is not watched."""
+        dirname = os.path.normpath(dirname)
+        if dirname in self._watch_descriptors:
+            return
+        flags = inotify_simple.flags
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | \
+            flags.DELETE | flags.MOVED_FROM | flags.ATTRIB
+        try:
+            watch_descriptor = self._inotify.add_watch(dirname, mask)
+        except OSError:
+            return
+        self._watched_dirs[watch_descriptor] = dirname
+        self._watch_descriptors[dirname] = watch_descriptor
+
+    def _unwatch_directory(self, dirname):
+        """Removes the inotify watches on a moved directory and its content.
+
+        The watches follow a moved directory, so the directories at the old
+        paths would not be watched again if they were created again.
+        """
+        prefix = os.path.join(dirname, '')
+        for watched_dirname in list(self._watch_descriptors):
+            if watched_dirname != dirname and \
+               not watched_dirname.startswith(prefix):
+                continue
+            watch_descriptor = self._watch_descriptors.pop(watched_dirname)
+            self._watched_dirs.pop(watch_descriptor, None)
+            try:
+                self._inotify.rm_watch(watch_descriptor)
+            except OSError:
+                pass
+
+    def _wait(self, timeout):
+        """Waits for changes until the timeout.
+
+        Args:
+            timeout: the maximum seconds to wait, or `None` to wait for
+                inotify events without a timeout.
+
+        Returns:
+            A set of paths that may have changed, or `None` if all watched
+            files should be checked.
+        """
+        if self._inotify is None:
+            time.sleep(min(timeout, _POLL_INTERVAL))
+            return None
+
+        if timeout is not None:
+            timeout = int(timeout * 1000)
+        paths = set()
+        # Waits a little longer after the first event so the changes of a
+        # save are handled together.
+        for event in self._inotify.read(timeout=timeout, read_delay=20):
+            # The watch of a removed directory is removed by the kernel.
+            if event.mask & inotify_simple.flags.IGNORED:
+                dirname = self._watched_dirs.pop(event.wd, None)
+                if self._watch_descriptors.get(dirname) == event.wd:
+                    del self._watch_descriptors[dirname]
+                continue
+            dirname = self._watched_dirs.get(event.wd)
+            if dirname is None or not event.name:
+                continue
+            path = os.path.normpath(os.path.join(dirname, event.name))
+            if event.mask & inotify_simple.flags.ISDIR:
+                if event.mask & inotify_simple.flags.MOVED_FROM:
+                    self._unwatch_directory(path)
+            # Ignores the files of other extensions such as editor backups.
+            elif os.path.splitext(event.name)[1][1:] not in self._extensions:
+                continue
+            # The watched files are named as they are collected, such as
+            # './name' for the files walked in the current directory.
+            paths.add(self._filenames_by_path.get(path, path))
+        return paths
+
+    def rescan(self):
+        """Finds added and removed files.
+
+        Returns:
+            A list of changed files including added and removed ones.
+        """
+        if self.cache is not None:
+            self.cache.reset()
+        if self._inotify is None:
+            filenames = list(self.collect_filenames(None))
+        else:
+            filenames = list(self.collect_filenames(self._watch_directory))
+            # The directories of the files given without being walked.
+            for filename in filenames:
+                self._watch_directory(os.path.dirname(filename) or '.')
+
+        self._filenames_by_path = dict(
+            (os.path.normpath(filename), filename) for filename in filenames)
+        filename_set = set(filenames)
+        changed_filenames = [f for f in self.signatures
+                             if f not in filename_set]
+        for filename in filenames:
+            if self.signatures.get(filename) != _get_signature(filename):
+                changed_filenames.append(filename)
+        return changed_filenames
+
+    def lint(self, filenames):
+        """Lints the files and prints the results.
+
+        Args:
+            filenames: the filenames to lint. Files that no longer exist are
+                removed from the watched files.
+        """
+        existing_filenames = list()
+        for filename in sorted(filenames):
+            signature = _get_signature(filename)
+            if signature is None:
+                self.signatures.pop(filename, None)
+                self.error_counts.pop(filename, None)
+                if self._entries is not None:
+                    self._entries.pop(filename, None)
+                continue
+            self.signatures[filename] = signature
+            existing_filenames.append(filename)
+
+        for filename, errors, warning in linter.lint_files(
+                existing_filenames, self.vlevel, self.jobs, self.cache,
+                guard=self.guard, pruner=self.pruner, pool=self._pool):
+            self.error_counts[filename] = len(errors)
+            if self._entries is None:
+                self.stream.report(filename, errors, warning)
+            elif errors or warning is not None:
+                self._entries[filename] = self._format(filename, errors,
+                                                       warning)
+            else:
+                self._entries.pop(filename, None)
+
+    def _format(self, filename, errors, warning):
+        """Returns the results of a file formatted by the stream."""
+        output = io.StringIO()
+        # Makes each entry start with a blank line.
+        self.stream.processed_files = 0
+        with contextlib.redirect_stdout(output):
+            self.stream.report(filename, errors, warning)
+        return output.getvalue()
+
+    def redraw(self):
+        """Clears the terminal and prints the kept results of all files."""
+        if self._entries is None:
+            return
+        sys.stdout.write(_CLEAR_SCREEN + ''.join(
+            self._entries[filename] for filename in sorted(self._entries)))
+
+    def print_status(self, elapsed_time):
+        """Prints the number of errors after the files are linted."""
+        self.redraw()
+        print(utility.get_ansi_code('FOREGROUND_WHITE') +
+              utility.get_ansi_code('STYLE_DIM') +
+              '\n[{0}] {1:d} files watched, {2:d} errors found '
+              '({3:.3f} seconds)'.format(time.strftime('%H:%M:%S'),
+                                         len(self.signatures),
+                                         self.total_error_counts,
+                                         elapsed_time) +
+              utility.get_ansi_code('FOREGROUND_RESET') +
+              utility.get_ansi_code('STYLE_RESET_ALL'))
+        # Makes the stream separate the next results from the status line.
+        self.stream.processed_files = 0
+
+    def run(self):
+        """Lints all files and then watches them until interrupted."""
+        start_time = time.time()
+        # The worker processes are reused for every change.
+        if self.jobs > 1:
+            self._pool = linter.create_pool(self.jobs)
+        # Only polling needs periodic rescans, as inotify reports the added
+        # files and directories.
+        polling = self._inotify is None
+        try:
+            self.lint(self.rescan())
+            self.print_status(time.time() - start_time)
+            rescan_time = time.time() + _RESCAN_INTERVAL
+            while True:
+                paths = self._wait(max(0, rescan_time - time.time())
+                                   if polling else None)
+                start_time = time.time()
+                if (polling and start_time >= rescan_time) or \
+                   (paths and not paths.issubset(self.signatures)):
+                    # Unknown paths may be added files or directories.
+                    changed_filenames = self.rescan()
+                    rescan_time = start_time + _RESCAN_INTERVAL
+                else:
+                    if paths is None:
+                        paths = self.signatures
+                    changed_filenames = [
+                        f for f in paths
+                        if self.signatures.get(f) != _get_signature(f)]
+                if changed_filenames:
+                    self.lint(changed_filenames)
+                    self.print_status(time.time() - start_time)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+            if self._inotify is not None:
+                self._inotify.close()
@@ -3,7 +3,10 @@
 import os
 import sys
 
-from distutils.core import setup
+try:
+    from setuptools import setup
+except ImportError:
+    from distutils.core import setup
 
 
 def fullsplit(path, result=None):
@@ -56,6 +59,7 @@ setup(
     url='https://github.com/ollix/cclint',
     license='BSD',
     packages=packages,
+    python_requires='>=3.7',
     install_requires=[
         'colorama',
         'cpplint'
@@ -63,7 +67,7 @@ setup(
     scripts=['cclint/bin/cclint'],
     entry_points={
         'console_scripts': [
-            'cclint = cclint:command.execute_from_command_line',
+            'cclint = cclint.main:main',
         ],
     },
     classifiers=[
@@ -73,8 +77,14 @@ setup(
         'License :: OSI Approved :: BSD License',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2',
         'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Topic :: Terminals',
     ]
 )
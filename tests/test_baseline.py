@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Tests of the baseline of known findings."""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from cclint import baseline
+from cclint import linter
+
+
+# The root directory of the repository.
+_ROOT_DIRNAME = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The source with one tab-indented line.
+_SOURCE = '// Copyright 2015 Olli Wang\nint main() {\n\treturn 0;\n}\n'
+# The same source with a second copy of the tab-indented line.
+_SOURCE_WITH_COPY = ('// Copyright 2015 Olli Wang\nint main() {\n'
+                     '\treturn 0;\n\treturn 0;\n}\n')
+
+
+class BaselineIndexTest(unittest.TestCase):
+    """Tests of `baseline.BaselineIndex`."""
+
+    def test_filter_uses_up_counts(self):
+        """Each known finding hides only one finding of its fingerprint."""
+        errors = [linter.LintError('a.cc', 3, 'whitespace/tab', 1, 'Tab'),
+                  linter.LintError('a.cc', 4, 'whitespace/tab', 1, 'Tab')]
+        fingerprints = [1, 1]
+        index = baseline.BaselineIndex([1])
+        self.assertEqual(index.filter(errors, fingerprints), errors[1:])
+        self.assertEqual(index.known_counts, 1)
+
+    def test_write_keeps_counts(self):
+        """A written baseline keeps the number of each finding."""
+        index = baseline.BaselineIndex(recording=True)
+        index.filter([None, None, None], [2, 1, 2])
+        dirname = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(dirname, 'baseline')
+            index.write(filename)
+            loaded_index = baseline.load_baseline(filename)
+        finally:
+            shutil.rmtree(dirname)
+        self.assertEqual(list(loaded_index.fingerprints), [1, 2, 2])
+        self.assertEqual(loaded_index.root, dirname)
+
+    def test_paths_are_relative_to_root(self):
+        """The same file has the same path from any directory."""
+        dirname = os.path.abspath(tempfile.gettempdir())
+        filename = os.path.join(dirname, 'src', 'a.cc')
+        self.assertEqual(baseline.get_path(filename, dirname), 'src/a.cc')
+        self.assertEqual(
+            baseline.get_path(os.path.relpath(filename), dirname), 'src/a.cc')
+
+
+class BaselineCommandTest(unittest.TestCase):
+    """Tests of the baseline flags of the command line client."""
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def _write_source(self, content):
+        with open(os.path.join(self.dirname, 'a.cc'), 'w',
+                  encoding='utf8') as source_file:
+            source_file.write(content)
+
+    def _run(self, *args, **kwargs):
+        """Runs cclint in the temporary directory and returns the process.
+
+        The process runs in the `cwd` keyword argument instead if it is
+        specified.
+        """
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            filter(None, [_ROOT_DIRNAME, env.get('PYTHONPATH')]))
+        return subprocess.run(
+            [sys.executable, '-c',
+             'from cclint import command; '
+             'command.execute_from_command_line()'] + list(args),
+            cwd=kwargs.get('cwd', self.dirname), env=env, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, universal_newlines=True, check=False)
+
+    def test_new_copy_of_known_error_is_reported(self):
+        """A second copy of a baselined error fails the run."""
+        self._write_source(_SOURCE)
+        process = self._run('--baseline=baseline', '--write-baseline', 'a.cc')
+        self.assertEqual(process.returncode, 0, process.stdout)
+
+        process = self._run('--baseline=baseline', 'a.cc')
+        self.assertEqual(process.returncode, 0, process.stdout)
+
+        self._write_source(_SOURCE_WITH_COPY)
+        process = self._run('--baseline=baseline', 'a.cc')
+        self.assertEqual(process.returncode, 1, process.stdout)
+        self.assertIn('whitespace/tab', process.stdout)
+        self.assertEqual(process.stdout.count('whitespace/tab'), 1)
+
+    def test_baseline_applies_from_other_directory(self):
+        """The known errors are matched when cclint runs elsewhere."""
+        self._write_source(_SOURCE)
+        process = self._run('--baseline=baseline', '--write-baseline', 'a.cc')
+        self.assertEqual(process.returncode, 0, process.stdout)
+
+        subdirname = os.path.join(self.dirname, 'sub')
+        os.mkdir(subdirname)
+        process = self._run('--baseline=../baseline', '../a.cc',
+                            cwd=subdirname)
+        self.assertEqual(process.returncode, 0, process.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
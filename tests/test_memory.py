@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Tests of the memory used for long lists of files."""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+# The root directory of the repository.
+_ROOT_DIRNAME = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The number of paths in the list. It is smaller than the million entries of
+# `benchmarks.memory` to keep the test fast, but the list still takes more
+# memory than the ceiling if it is held at once.
+_PATH_COUNTS = 300000
+# The ceiling of the peak RSS in megabytes.
+_MAX_RSS = 32
+# The script streaming the list through `lint_files()` with linting stubbed
+# out and printing its peak RSS in megabytes.
+_SCRIPT = r'''
+import resource
+import sys
+
+from cclint import file_list
+from cclint import linter
+
+def lint_file_with_name(filename, *args, **kwargs):
+    return filename, [], None, None, None
+
+def read_files(filenames):
+    for filename in filenames:
+        yield filename, b''
+
+linter._lint_file_with_name = lint_file_with_name
+counts = 0
+for _ in linter.lint_files(file_list.read_null_delimited(sys.argv[1]), 1,
+                           reader=read_files):
+    counts += 1
+assert counts == int(sys.argv[2]), counts
+peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(peak_rss / (1024.0 * 1024 if sys.platform == 'darwin' else 1024.0))
+'''
+# The script running the command in its arguments. Linux keeps the peak RSS
+# of a process across `exec()`, so the script is started by this small
+# process rather than by the test runner, whose memory would be counted.
+_LAUNCHER_SCRIPT = ('import subprocess, sys; '
+                    'sys.exit(subprocess.call(sys.argv[1:]))')
+
+
+@unittest.skipIf(sys.platform == 'win32', 'resource is not available')
+class MemoryTest(unittest.TestCase):
+    """Tests of the peak RSS of linting a long list of files."""
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def test_long_list_is_streamed(self):
+        """The peak RSS stays under the ceiling for a long list."""
+        list_filename = os.path.join(self.dirname, 'list')
+        with open(list_filename, 'wb') as list_file:
+            for index in range(_PATH_COUNTS):
+                list_file.write(
+                    'src/module_{0:d}/directory_{1:d}/source_file_{2:d}.cc'
+                    '\0'.format(index // 1000, index // 100, index).encode())
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            filter(None, [_ROOT_DIRNAME, env.get('PYTHONPATH')]))
+        output = subprocess.check_output(
+            [sys.executable, '-c', _LAUNCHER_SCRIPT, sys.executable, '-c',
+             _SCRIPT, list_filename, str(_PATH_COUNTS)],
+            env=env, universal_newlines=True)
+        self.assertLess(float(output), _MAX_RSS, output)
+
+
+if __name__ == '__main__':
+    unittest.main()
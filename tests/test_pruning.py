@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Tests of skipping the checks whose errors are all filtered out."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import cpplint
+
+from benchmarks import pruning as pruning_benchmark
+from cclint import linter
+from cclint import pruning
+
+
+# The sets of filters to check, taken from the pruning benchmark and
+# including filters selecting categories and lines.
+# pylint: disable=protected-access
+_FILTER_SETS = tuple(pruning_benchmark._FILTER_SETS[index]
+                     for index in (0, 1, 2, 5, 6))
+# pylint: enable=protected-access
+# The source triggering errors of several categories.
+_SOURCE = r'''#include <stdio.h>
+#include "sample.h"
+
+using namespace std;
+
+long long counter = 0;
+
+class Base {
+ public:
+  Base(int value) : value_(value) {}
+ private:
+  int value_;
+};
+
+void Function(int *pointer)  {
+	char buffer[10];
+  sprintf(buffer, "%d", *pointer);
+  int* cast = (int*)pointer;
+  if(*pointer==1){ *pointer++; }
+  // TODO: fix this
+''' + '  // {0}\n}}\n'.format(' '.join(['long'] * 20))
+
+
+class CheckPrunerTest(unittest.TestCase):
+    """Tests of `pruning.CheckPruner`."""
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dirname, 'sample.cc')
+        with open(self.filename, 'w', encoding='utf8') as source_file:
+            source_file.write(_SOURCE)
+        self.state = linter.get_cpplint_state()
+
+    def tearDown(self):
+        linter.set_cpplint_state(self.state)
+        shutil.rmtree(self.dirname)
+
+    def _lint(self, pruner):
+        """Returns the comparable results of linting the sample."""
+        return [(filename, warning,
+                 [(error.line, error.category, error.confidence,
+                   error.message) for error in errors])
+                for filename, errors, warning in linter.lint_files(
+                    [self.filename], 1, pruner=pruner)]
+
+    def test_results_are_unchanged(self):
+        """Pruning does not change the errors for any set of filters."""
+        pruner = pruning.CheckPruner()
+        for filters in _FILTER_SETS:
+            with self.subTest(filters=filters):
+                # pylint: disable=protected-access
+                cpplint._SetFilters(filters)
+                results = self._lint(None)
+                self.assertTrue(results[0][2])
+                self.assertEqual(self._lint(pruner), results)
+
+
+if __name__ == '__main__':
+    unittest.main()
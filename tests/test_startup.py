@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2015 Olli Wang. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+#    * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following disclaimer
+# in the documentation and/or other materials provided with the
+# distribution.
+#    * Neither the name of Olli Wang nor the names of its
+# contributors may be used to endorse or promote products derived from
+# this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+"""Tests of the startup of the command line client."""
+
+import unittest
+
+from benchmarks import startup
+
+
+# The number of times to import the entry point, of which the fastest counts.
+_REPEAT = 3
+
+
+class StartupTest(unittest.TestCase):
+    """Tests of importing `cclint.main` in a fresh interpreter."""
+
+    def test_main_imports_little(self):
+        """Importing `cclint.main` is fast and does not import cpplint."""
+        # pylint: disable=protected-access
+        budget = dict((module, budget) for module, _, budget, _
+                      in startup._ENTRY_POINTS)['cclint.main']
+        results = [startup.measure('cclint.main') for _ in range(_REPEAT)]
+        imported_modules = results[0][1]
+        self.assertIn('cclint.main', imported_modules)
+        for module in ('cclint.linter', 'cclint.server', 'cpplint'):
+            self.assertNotIn(module, imported_modules)
+        self.assertLessEqual(min(result[0] for result in results), budget)
+
+
+if __name__ == '__main__':
+    unittest.main()